@@ -20,10 +20,11 @@ module "lambda" {
 }
 
 module "iam" {
-  source          = "../../modules/iam"
-  tags            = var.tags
-  roles           = var.roles
-  inline_policies = var.inline_policies
+  source           = "../../modules/iam"
+  tags             = var.tags
+  roles            = var.roles
+  inline_policies  = var.inline_policies
+  policy_documents = var.policy_documents
 }
 
 module "secrets" {
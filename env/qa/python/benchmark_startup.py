@@ -0,0 +1,68 @@
+"""
+Startup-time benchmark for main.py.
+
+Measures what a run pays before its first AWS API call: importing main.py,
+importing the fetcher modules for the requested resource types and building
+their boto3 clients. Each sample runs in a fresh interpreter so import caches
+do not leak between samples. No AWS calls or credentials are needed.
+
+    python benchmark_startup.py                      # S3-only vs all types
+    python benchmark_startup.py --types AWS::S3::Bucket AWS::Lambda::Function
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SAMPLE_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+from modules.aws_clients import configure, get_client
+from modules.resource_registry import RESOURCE_HANDLERS
+
+configure(region="us-east-1")
+types = json.loads(sys.argv[1]) or list(RESOURCE_HANDLERS)
+for rtype in types:
+    handler = RESOURCE_HANDLERS[rtype]
+    handler.resolve()
+    get_client(handler.service)
+elapsed = time.perf_counter() - start
+loaded = [m for m in sys.modules if m.startswith("modules.")]
+print(json.dumps({"seconds": elapsed, "modules": len(loaded)}))
+"""
+
+
+def sample(types):
+    out = subprocess.run(
+        [sys.executable, "-c", SAMPLE_CODE, json.dumps(types)],
+        check=True, capture_output=True, text=True,
+        # main.py and modules/ are imported relative to this script's directory
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def benchmark(label, types, runs):
+    samples = [sample(types) for _ in range(runs)]
+    times = [s["seconds"] * 1000 for s in samples]
+    print(
+        f"{label:<40} median {statistics.median(times):8.1f} ms   "
+        f"min {min(times):8.1f} ms   fetcher/infra modules loaded: {samples[0]['modules']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark main.py startup cost")
+    parser.add_argument("--types", nargs="+", default=["AWS::S3::Bucket"])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    benchmark("--types " + " ".join(args.types), args.types, args.runs)
+    benchmark("all registered types", [], args.runs)
+
+
+if __name__ == "__main__":
+    main()
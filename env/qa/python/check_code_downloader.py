@@ -0,0 +1,177 @@
+"""
+Local check for modules/code_downloader.py.
+
+Serves generated packages from a local HTTP server (with Range support) and
+exercises the downloader end to end: concurrent downloads, resuming a .part
+file, rejecting a bad checksum, refreshing an expired URL, the
+skip-if-unchanged sync with its content-addressed store, and repairing a
+package rewritten in place. No AWS calls or credentials are needed. Exits
+non-zero on the first failed check.
+
+    python check_code_downloader.py
+"""
+import base64
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ".")
+
+from modules import code_downloader  # noqa: E402
+from modules.code_downloader import (  # noqa: E402
+    download_package,
+    download_packages,
+    load_index,
+    store_path,
+    sync_packages,
+)
+
+PACKAGES = {f"pkg{i}": os.urandom(3 * 1024 * 1024 + i) for i in range(6)}
+# Two functions deploying the same package
+PACKAGES["shared"] = PACKAGES["pkg0"]
+
+requests_seen = []
+_seen_lock = threading.Lock()
+
+
+def sha(data):
+    return base64.b64encode(hashlib.sha256(data).digest()).decode("ascii")
+
+
+class PackageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        name, _, query = self.path.lstrip("/").partition("?")
+        with _seen_lock:
+            requests_seen.append((name, self.headers.get("Range")))
+        if query == "expired":
+            self.send_error(403)
+            return
+        data = PACKAGES.get(name)
+        if data is None:
+            self.send_error(404)
+            return
+        if query == "corrupt":
+            data = data[:-1] + bytes([data[-1] ^ 0xFF])
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(data):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+def check(condition, message):
+    if not condition:
+        print(f"FAIL {message}")
+        sys.exit(1)
+    print(f"OK   {message}")
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PackageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    # Retries back off with random sleeps; keep the check fast
+    code_downloader.time.sleep = lambda seconds: None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Concurrent downloads
+        jobs = [
+            {"url": f"{base}/{name}", "path": os.path.join(tmp, "parallel", f"{name}.zip"), "sha256": sha(data)}
+            for name, data in PACKAGES.items()
+        ]
+        results = download_packages(jobs, max_workers=4)
+        check(all(results.values()), "parallel downloads succeed")
+        check(
+            all(open(job["path"], "rb").read() == PACKAGES[name] for job, name in zip(jobs, PACKAGES)),
+            "parallel downloads match the served bytes",
+        )
+
+        # Resume from a partial .part file with a Range request
+        path = os.path.join(tmp, "resume", "pkg1.zip")
+        os.makedirs(os.path.dirname(path))
+        with open(f"{path}.part", "wb") as f:
+            f.write(PACKAGES["pkg1"][:1000000])
+        del requests_seen[:]
+        check(download_package(f"{base}/pkg1", path, sha(PACKAGES["pkg1"])), "interrupted download resumes")
+        check(requests_seen == [("pkg1", "bytes=1000000-")], "resume asks only for the missing bytes")
+        check(open(path, "rb").read() == PACKAGES["pkg1"], "resumed package is complete")
+
+        # Without a checksum a leftover .part is never resumed
+        path = os.path.join(tmp, "unverified", "pkg5.zip")
+        os.makedirs(os.path.dirname(path))
+        with open(f"{path}.part", "wb") as f:
+            f.write(b"stale bytes from an older package")
+        del requests_seen[:]
+        check(download_package(f"{base}/pkg5", path), "unverified download succeeds")
+        check(requests_seen == [("pkg5", None)], "unverified download starts over")
+        check(open(path, "rb").read() == PACKAGES["pkg5"], "unverified download drops the stale part")
+
+        # Checksum mismatch is rejected and never replaces the target
+        path = os.path.join(tmp, "corrupt", "pkg2.zip")
+        ok = download_package(f"{base}/pkg2?corrupt", path, sha(PACKAGES["pkg2"]), max_attempts=2)
+        check(not ok and not os.path.exists(path), "corrupt package is rejected")
+        check(not os.path.exists(f"{path}.part"), "corrupt partial download is discarded")
+
+        # A callable URL is asked again on every attempt
+        urls = iter([f"{base}/pkg3?expired", f"{base}/pkg3"])
+        path = os.path.join(tmp, "expired", "pkg3.zip")
+        check(download_package(lambda: next(urls), path, sha(PACKAGES["pkg3"])), "expired URL is refreshed")
+
+        # Sync: identical packages are fetched once, unchanged ones are skipped
+        code_dir = os.path.join(tmp, "code")
+        index_path = os.path.join(code_dir, ".code_index.json")
+        store_dir = os.path.join(code_dir, ".store")
+        jobs = [
+            {"url": f"{base}/{name}", "path": os.path.join(code_dir, f"{name}.zip"), "sha256": sha(data)}
+            for name, data in PACKAGES.items()
+        ]
+        del requests_seen[:]
+        results = sync_packages(jobs, index_path=index_path, max_workers=4, store_dir=store_dir)
+        check(all(results.values()), "first sync downloads every package")
+        check(len(requests_seen) == len(PACKAGES) - 1, "identical packages are downloaded once")
+        check(
+            os.path.samefile(os.path.join(code_dir, "pkg0.zip"), os.path.join(code_dir, "shared.zip")),
+            "identical packages share one store object",
+        )
+        check(len(load_index(index_path)) == len(PACKAGES), "index records every package")
+
+        del requests_seen[:]
+        results = sync_packages(jobs, index_path=index_path, max_workers=4, store_dir=store_dir)
+        check(results == {} and requests_seen == [], "second sync downloads nothing")
+
+        # A package rewritten in place is detected and repaired
+        obj = store_path(sha(PACKAGES["pkg4"]), store_dir)
+        check(os.stat(obj).st_mode & 0o222 == 0, "store objects are read-only")
+        target = os.path.join(code_dir, "pkg4.zip")
+        os.chmod(target, 0o644)
+        with open(target, "r+b") as f:
+            f.write(b"tampered")
+        del requests_seen[:]
+        results = sync_packages(jobs, index_path=index_path, max_workers=4, store_dir=store_dir)
+        check(list(results) == [target] and results[target], "tampered package is re-synced")
+        check(open(target, "rb").read() == PACKAGES["pkg4"], "tampered package is restored")
+
+    server.shutdown()
+    print("All code downloader checks passed")
+
+
+if __name__ == "__main__":
+    main()
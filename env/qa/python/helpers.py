@@ -1,18 +1,7 @@
 import json
 import os
-import requests
 from botocore.exceptions import ClientError
 
-# -----------------------
-# Function: Download Lambda code
-# -----------------------
-def download_lambda_code(url, filename):
-    """Download the Lambda deployment package to a local file"""
-    response = requests.get(url)
-    response.raise_for_status()
-    with open(filename, "wb") as f:
-        f.write(response.content)
-
 # -----------------------
 # Normalize IAM tags
 # -----------------------
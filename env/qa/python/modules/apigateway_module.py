@@ -1,9 +1,11 @@
-import boto3
 from botocore.exceptions import ClientError
 import re
+import threading
+from modules.aws_clients import lazy_client
+from modules.concurrency import parallel_map
 
-apigw = boto3.client("apigateway")
-sts = boto3.client("sts")
+apigw = lazy_client("apigateway")
+sts = lazy_client("sts")
 
 
 def list_rest_apis():
@@ -154,6 +156,7 @@ def list_stages_for_api(rest_api_id):
             }
     except ClientError as e:
         print(f"⚠️ Error listing stages for API {rest_api_id}: {e}")
+        raise
     return stages
 
 
@@ -182,8 +185,9 @@ def parse_stage_from_rid(physical_resource_id):
 
 
 def find_stage_config(api_ids, stage_name):
+    inventory = get_inventory()
     for api_id in api_ids:
-        stages = list_stages_for_api(api_id)
+        stages = inventory.stages(api_id)
         if stage_name in stages:
             return api_id, stages[stage_name]
     return None, None
@@ -209,18 +213,150 @@ def list_resources_for_api(rest_api_id):
                 }
     except ClientError as e:
         print(f"⚠️ Error listing resources for API {rest_api_id}: {e}")
+        raise
     return resources
 
 
+class ApiGatewayInventory:
+    """
+    Per-run catalogue of REST APIs, their stages, deployments and resources
+    (with embedded methods). Each listing is paged once on first use and then
+    served from memory, with resource-id, deployment-id -> API and
+    stage-name -> [API] indices, so per-resource lookups cost no API calls.
+    Failed listings are not cached: the lookup raises and the next one retries.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self.resources = {}
+        self.methods = {}
+        self._rest_apis = None
+        self._stages = {}
+        self._deployments = {}
+        self._api_resources = {}
+        self._stage_apis = None
+        self._deployment_apis = None
+        self._resources_loaded = False
+        self._lock = threading.RLock()
+
+    # -----------------------
+    # REST APIs, stages, deployments
+    # -----------------------
+    def rest_apis(self):
+        with self._lock:
+            if self._rest_apis is None:
+                self._rest_apis = list_rest_apis()
+            return self._rest_apis
+
+    def stages(self, api_id):
+        with self._lock:
+            if api_id not in self._stages:
+                self._stages[api_id] = list_stages_for_api(api_id)
+            return self._stages[api_id]
+
+    def deployments(self, api_id):
+        with self._lock:
+            if api_id not in self._deployments:
+                self._deployments[api_id] = list_deployments_for_api(api_id)
+            return self._deployments[api_id]
+
+    def _load_per_api(self, cache, load, api_ids):
+        """
+        Fill cache[api_id] for the APIs not listed yet, concurrently. APIs whose
+        listing fails stay out of the cache, and the first error is re-raised.
+        """
+        missing = [api_id for api_id in api_ids if api_id not in cache]
+
+        def attempt(api_id):
+            try:
+                return load(api_id), None
+            except ClientError as e:
+                return None, e
+
+        errors = []
+        for api_id, (result, error) in zip(missing, parallel_map(attempt, missing, max_workers=self.max_workers)):
+            if error is None:
+                cache[api_id] = result
+            else:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+
+    def apis_for_stage(self, stage_name):
+        with self._lock:
+            if self._stage_apis is None:
+                api_ids = list(self.rest_apis().keys())
+                self._load_per_api(self._stages, list_stages_for_api, api_ids)
+                stage_apis = {}
+                for api_id in api_ids:
+                    for name in self._stages[api_id]:
+                        stage_apis.setdefault(name, []).append(api_id)
+                self._stage_apis = stage_apis
+            return self._stage_apis.get(stage_name, [])
+
+    def api_for_deployment(self, deployment_id):
+        with self._lock:
+            if self._deployment_apis is None:
+                api_ids = list(self.rest_apis().keys())
+                self._load_per_api(self._deployments, list_deployments_for_api, api_ids)
+                deployment_apis = {}
+                for api_id in api_ids:
+                    for dep_id in self._deployments[api_id]:
+                        deployment_apis.setdefault(dep_id, api_id)
+                self._deployment_apis = deployment_apis
+            return self._deployment_apis.get(deployment_id)
+
+    # -----------------------
+    # Resources and methods
+    # -----------------------
+    def load(self):
+        with self._lock:
+            if self._resources_loaded:
+                return self
+            api_ids = list(self.rest_apis().keys())
+            self._load_per_api(self._api_resources, list_resources_for_api, api_ids)
+            for api_id in api_ids:
+                for rid, cfg in self._api_resources[api_id].items():
+                    self.resources[rid] = cfg
+                    for method_name, method_cfg in (cfg.get("resource_methods") or {}).items():
+                        self.methods[(rid, method_name)] = method_cfg
+            self._resources_loaded = True
+        return self
+
+    def get_resource(self, resource_id):
+        return self.load().resources.get(resource_id)
+
+    def get_method(self, resource_id, http_method):
+        return self.load().methods.get((resource_id, http_method))
+
+    def get_integration(self, resource_id, http_method):
+        method_cfg = self.get_method(resource_id, http_method) or {}
+        return method_cfg.get("methodIntegration")
+
+    def get_method_response(self, resource_id, http_method, status_code):
+        method_cfg = self.get_method(resource_id, http_method) or {}
+        return (method_cfg.get("methodResponses") or {}).get(status_code)
+
+    def get_integration_response(self, resource_id, http_method, status_code):
+        integration = self.get_integration(resource_id, http_method) or {}
+        return (integration.get("integrationResponses") or {}).get(status_code)
+
+
+_inventory = ApiGatewayInventory()
+
+
+def get_inventory():
+    return _inventory
+
+
 def find_resources_by_ids(resource_ids):
     found = {}
     try:
-        apis = list_rest_apis()
-        for api_id in apis.keys():
-            api_resources = list_resources_for_api(api_id)
-            for rid, cfg in api_resources.items():
-                if rid in resource_ids:
-                    found[rid] = cfg
+        inventory = get_inventory()
+        for rid in resource_ids:
+            cfg = inventory.get_resource(rid)
+            if cfg:
+                found[rid] = cfg
     except Exception as e:
         print(f"⚠️ Error finding resources by ids: {e}")
     return found
@@ -241,6 +377,7 @@ def list_deployments_for_api(rest_api_id):
                 }
     except ClientError as e:
         print(f"⚠️ Error listing deployments for API {rest_api_id}: {e}")
+        raise
     return deployments
 
 
@@ -291,3 +428,92 @@ def get_base_path_mapping(domain_name, base_path):
         return None
 
 
+
+
+# -----------------------
+# Resolve CloudFormation physical ids
+# -----------------------
+def get_rest_api_config_for_rid(rid):
+    apis_all = get_inventory().rest_apis()
+    api_id = extract_rest_api_id_from_rid(rid)
+    if not api_id:
+        # heuristic: if exactly one API exists, use it
+        if len(apis_all) == 1:
+            api_id = next(iter(apis_all.keys()))
+    if api_id:
+        # get_rest_apis already returned the same fields
+        if api_id in apis_all:
+            return dict(apis_all[api_id])
+        return get_rest_api_config_by_id(api_id)
+    return None
+
+
+def get_account_config_for_rid(rid):
+    # The API Gateway account is a per-region singleton; rid carries no id
+    return get_account()
+
+
+def get_stage_config_for_rid(rid):
+    inventory = get_inventory()
+    api_id, stage_name = parse_stage_from_rid(rid)
+    stage_cfg = None
+    if api_id and stage_name:
+        stage_cfg = inventory.stages(api_id).get(stage_name)
+    elif stage_name:
+        # Search across all APIs that have a stage with this name
+        api_id, stage_cfg = find_stage_config(inventory.apis_for_stage(stage_name), stage_name)
+
+    if stage_cfg:
+        # Ensure keys present for import; copy so the catalogue stays untouched
+        stage_cfg = dict(stage_cfg)
+        stage_cfg["rest_api_id"] = api_id or stage_cfg.get("rest_api_id")
+        stage_cfg["stage_name"] = stage_name or stage_cfg.get("stage_name")
+    return stage_cfg
+
+
+def get_resource_config_by_id(resource_id):
+    # rid is the API Gateway Resource ID; the inventory knows its API context.
+    # Listing errors propagate so the scheduler records the item as failed.
+    return get_inventory().get_resource(resource_id)
+
+
+def get_base_path_mapping_for_rid(rid, known_domains):
+    # BasePathMapping rid is typically domain_name|base_path or similar
+    # The rid might be in format like "api-qa.helloporter.com|(none)" or similar
+    parts = rid.split("|") if "|" in rid else [rid, "(none)"]
+    domain_name = parts[0]
+    base_path = parts[1] if len(parts) > 1 else "(none)"
+
+    mapping_cfg = get_base_path_mapping(domain_name, base_path)
+    if mapping_cfg:
+        return mapping_cfg
+
+    # Fallback: try to find it by listing all mappings for known domains
+    for domain_rid in known_domains.keys():
+        mappings = list_base_path_mappings_for_domain(domain_rid)
+        for mapping_key, mapping_data in mappings.items():
+            if mapping_key == rid or domain_rid in rid:
+                return mapping_data
+    return None
+
+
+def get_deployment_config_for_rid(rid, known_stages):
+    # Deployment rid is deployment ID; need to find which API it belongs to
+    # Try to extract from stages that reference it
+    found_api_id = None
+    for stage_cfg in known_stages.values():
+        if stage_cfg.get("deployment_id") == rid:
+            found_api_id = stage_cfg.get("rest_api_id")
+            break
+
+    inventory = get_inventory()
+    if not found_api_id:
+        # Fallback: the deployment-id index covers every API
+        found_api_id = inventory.api_for_deployment(rid)
+
+    if found_api_id:
+        deployment = inventory.deployments(found_api_id).get(rid)
+        if deployment:
+            return dict(deployment)
+        return get_deployment_by_id(found_api_id, rid)
+    return None
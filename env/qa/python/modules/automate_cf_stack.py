@@ -1,15 +1,16 @@
 import os
-import boto3
 import json
 import requests
 from botocore.exceptions import ClientError
+from modules.aws_clients import lazy_client
+from modules.managed_policy_cache import get_managed_policy_cache
 
 
-cf = boto3.client("cloudformation")
-s3 = boto3.client("s3")
-dynamodb = boto3.client("dynamodb")
-lambda_client = boto3.client("lambda")
-iam = boto3.client("iam")
+cf = lazy_client("cloudformation")
+s3 = lazy_client("s3")
+dynamodb = lazy_client("dynamodb")
+lambda_client = lazy_client("lambda")
+iam = lazy_client("iam")
 
 # -----------------------
 # Function: List all stacks
@@ -362,15 +363,14 @@ def get_iam_group_config(group_name):
 # -----------------------
 def get_iam_managed_policy_config(policy_arn):
     try:
-        resp = iam.get_policy(PolicyArn=policy_arn)
-        policy = resp["Policy"]
-        # Default version
+        # Metadata and default-version document, shared across every attachment
+        cached = get_managed_policy_cache().get(policy_arn)
+        policy = cached["policy"]
         default_ver_id = policy["DefaultVersionId"]
-        ver_resp = iam.get_policy_version(PolicyArn=policy_arn, VersionId=default_ver_id)
-        policy_doc = ver_resp["PolicyVersion"]["Document"]
+        policy_doc = cached["document"]
 
-        tags_resp = iam.list_policy_tags(PolicyArn=policy_arn)
-        tags = tags_resp.get("Tags", [])
+        # get_policy already returns the policy's tags
+        tags = policy.get("Tags", [])
 
         # Entities this policy is attached to:
         entities = iam.list_entities_for_policy(PolicyArn=policy_arn)
@@ -0,0 +1,115 @@
+# modules/aws_clients.py
+#
+# Central boto3 session/client provider. Clients are built on first use and
+# cached per (service, region, profile), so a run only pays for the service
+# models it actually touches. Every client is wrapped by the shared rate
+# limiter and sized to the configured concurrency. When a ResponseCache is
+# configured it sits below the limiter, so cache hits never take a token.
+
+import threading
+
+import boto3
+from botocore.config import Config
+
+from modules.concurrency import DEFAULT_WORKERS
+from modules.rate_limiter import throttled
+
+# botocore's default pool size; raised when more workers are configured
+MIN_POOL_CONNECTIONS = 10
+
+_settings = {
+    "region": None,
+    "profile": None,
+    "max_pool_connections": max(MIN_POOL_CONNECTIONS, DEFAULT_WORKERS),
+    "cache": None,
+}
+_accounts = {}
+_sessions = {}
+_clients = {}
+_lock = threading.RLock()
+
+
+def configure(max_workers=None, region=None, profile=None, cache=None):
+    """
+    Set the defaults used for clients built from now on.
+    Already-built clients are dropped so they pick up the new settings.
+    cache is an optional modules.response_cache.ResponseCache.
+    """
+    with _lock:
+        if cache is not None:
+            _settings["cache"] = cache
+        if max_workers:
+            _settings["max_pool_connections"] = max(MIN_POOL_CONNECTIONS, max_workers)
+        if region:
+            _settings["region"] = region
+        if profile:
+            _settings["profile"] = profile
+        _clients.clear()
+
+
+def get_session(profile=None):
+    profile = profile or _settings["profile"]
+    with _lock:
+        session = _sessions.get(profile)
+        if session is None:
+            session = boto3.session.Session(profile_name=profile)
+            _sessions[profile] = session
+        return session
+
+
+def get_client(service, region=None, profile=None, cache=True):
+    """
+    Shared, rate-limited client for (service, region, profile).
+    cache=False skips the response cache, for calls whose responses go stale
+    faster than any TTL (e.g. presigned URLs).
+    """
+    region = region or _settings["region"]
+    profile = profile or _settings["profile"]
+    key = (service, region, profile, cache)
+
+    cached = _clients.get(key)
+    if cached is not None:
+        return cached
+
+    # boto3 sessions are not thread-safe, so build clients under the lock
+    with _lock:
+        cached = _clients.get(key)
+        if cached is None:
+            config = Config(max_pool_connections=_settings["max_pool_connections"])
+            client = get_session(profile).client(service, region_name=region, config=config)
+            response_cache = _settings["cache"] if cache else None
+            if response_cache is not None:
+                # STS is keyed by profile since it is what resolves the account
+                account = f"profile:{profile}" if service == "sts" else _account_id(region, profile)
+                response_cache.attach(client, account)
+            cached = throttled(client)
+            _clients[key] = cached
+        return cached
+
+
+def _account_id(region, profile):
+    """Account id for cache keys; resolved once per profile (through the cache when enabled)."""
+    with _lock:
+        if profile not in _accounts:
+            sts = get_client("sts", region, profile)
+            _accounts[profile] = sts.get_caller_identity()["Account"]
+        return _accounts[profile]
+
+
+class LazyClient:
+    """Stand-in for a module-level client that resolves it on first attribute access."""
+
+    def __init__(self, service, region=None, cache=True):
+        self._service = service
+        self._region = region
+        self._cache = cache
+
+    def __getattr__(self, name):
+        return getattr(get_client(self._service, self._region, cache=self._cache), name)
+
+    def __repr__(self):
+        return f"LazyClient({self._service!r})"
+
+
+def lazy_client(service, region=None, cache=True):
+    return LazyClient(service, region, cache)
@@ -1,17 +1,35 @@
-import boto3
 
-cf = boto3.client("cloudformation")
+from modules.concurrency import DEFAULT_WORKERS, parallel_map
+from modules.aws_clients import lazy_client
+
+cf = lazy_client("cloudformation")
 
 # -----------------------
 # Function: List all stacks
 # -----------------------
 def list_stacks():
-    stacks = []
+    return [summary["name"] for summary in list_stack_summaries()]
+
+
+# -----------------------
+# Function: List stack summaries
+# -----------------------
+def list_stack_summaries():
+    """
+    Stack name, last change time (LastUpdatedTime, or CreationTime for stacks
+    never updated) and drift status for every live stack.
+    """
+    summaries = []
     paginator = cf.get_paginator("list_stacks")
     for page in paginator.paginate(StackStatusFilter=["CREATE_COMPLETE", "UPDATE_COMPLETE"]):
         for stack in page["StackSummaries"]:
-            stacks.append(stack["StackName"])
-    return stacks
+            changed_at = stack.get("LastUpdatedTime") or stack.get("CreationTime")
+            summaries.append({
+                "name": stack["StackName"],
+                "last_updated": changed_at.isoformat() if changed_at else None,
+                "drift_status": stack.get("DriftInformation", {}).get("StackDriftStatus", "NOT_CHECKED"),
+            })
+    return summaries
 
 # -----------------------
 # Function: List stack resources
@@ -24,3 +42,25 @@ def list_stack_resources(stack_name):
             if res["ResourceStatus"] != "DELETE_COMPLETE":
                 resources.append(res)
     return resources
+
+
+# -----------------------
+# Function: List resources for many stacks concurrently
+# -----------------------
+def list_all_stack_resources(stack_names, max_workers=DEFAULT_WORKERS):
+    """
+    Page the resource summaries of every stack through a bounded thread pool.
+    Returns {stack_name: [resources]} in the same order as stack_names; a
+    stack whose listing failed maps to None rather than an empty list.
+    """
+    stack_names = list(stack_names)
+    results = parallel_map(_list_stack_resources_safe, stack_names, max_workers)
+    return dict(zip(stack_names, results))
+
+
+def _list_stack_resources_safe(stack_name):
+    try:
+        return list_stack_resources(stack_name)
+    except Exception as e:
+        print(f"⚠️ Error listing resources for stack {stack_name}: {e}")
+        return None
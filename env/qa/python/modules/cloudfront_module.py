@@ -1,8 +1,8 @@
 # modules/cloudfront_module.py
 
-import boto3
+from modules.aws_clients import lazy_client
 
-cloudfront = boto3.client("cloudfront")
+cloudfront = lazy_client("cloudfront")
 
 def format_tags(tag_response):
     """Convert AWS tag response to Terraform map format."""
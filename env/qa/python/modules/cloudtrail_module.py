@@ -1,8 +1,8 @@
 # modules/cloudtrail_module.py
 
-import boto3
+from modules.aws_clients import lazy_client
 
-ct = boto3.client("cloudtrail")
+ct = lazy_client("cloudtrail")
 
 def format_tags(tag_list):
     """Convert AWS tag list to Terraform-style list of maps."""
@@ -1,8 +1,14 @@
 # modules/cloudwatch_module.py
 
-import boto3
+import threading
 
-logs = boto3.client("logs")
+from modules.aws_clients import lazy_client
+from modules.concurrency import parallel_map
+
+logs = lazy_client("logs")
+
+# Concurrent list_tags_log_group calls while prefetching
+TAG_WORKERS = 8
 
 
 def format_tags(tag_list):
@@ -10,31 +16,59 @@ def format_tags(tag_list):
     return {tag["key"]: tag["value"] for tag in tag_list}
 
 
+# -----------------------
+# Log group catalogue: one describe_log_groups pass per run, exact-name index
+# -----------------------
+_log_groups = None
+_log_group_tags = {}
+_catalogue_lock = threading.Lock()
+
+
+def get_log_group_catalogue():
+    global _log_groups
+    with _catalogue_lock:
+        if _log_groups is None:
+            catalogue = {}
+            paginator = logs.get_paginator("describe_log_groups")
+            for page in paginator.paginate():
+                for log_group in page.get("logGroups", []):
+                    catalogue[log_group["logGroupName"]] = log_group
+            _log_groups = catalogue
+        return _log_groups
+
+
+def get_log_group_tags(log_group_name):
+    if log_group_name not in _log_group_tags:
+        try:
+            tag_resp = logs.list_tags_log_group(logGroupName=log_group_name)
+            _log_group_tags[log_group_name] = tag_resp.get("tags", {})
+        except Exception as tag_err:
+            print(f"⚠️ Failed to get tags for log group {log_group_name}: {tag_err}")
+            return {}
+    return _log_group_tags[log_group_name]
+
+
+def prefetch_log_groups(log_group_names):
+    """Load the catalogue, then fetch tags for the requested groups concurrently."""
+    catalogue = get_log_group_catalogue()
+    names = [name for name in log_group_names if name in catalogue and name not in _log_group_tags]
+    parallel_map(get_log_group_tags, names, max_workers=TAG_WORKERS)
+
+
 def get_log_group_config(log_group_name):
     """Fetch log group config and tags."""
     try:
-        response = logs.describe_log_groups(logGroupNamePrefix=log_group_name, limit=1)
-        if not response["logGroups"]:
+        log_group = get_log_group_catalogue().get(log_group_name)
+        if not log_group:
             return None
 
-        log_group = response["logGroups"][0]
-        result = {
+        return {
             "name": log_group["logGroupName"],
             "retention_in_days": log_group.get("retentionInDays", None),
             "kms_key_id": log_group.get("kmsKeyId", None),
-            "tags": {}
+            "tags": get_log_group_tags(log_group_name),
         }
 
-        # Get tags
-        try:
-            tag_resp = logs.list_tags_log_group(logGroupName=log_group_name)
-            result["tags"] = tag_resp.get("tags", {})
-        except Exception as tag_err:
-            print(f"⚠️ Failed to get tags for log group {log_group_name}: {tag_err}")
-
-        return result
-
     except Exception as e:
         print(f"⚠️ Error getting log group {log_group_name}: {e}")
         return None
-
@@ -0,0 +1,322 @@
+# modules/code_downloader.py
+#
+# Lambda deployment package downloads. Packages stream to disk in chunks on a
+# bounded pool sharing one pooled HTTP session, are verified against the
+# function's CodeSha256 (base64 SHA-256), and only replace the target file
+# once complete. An interrupted download leaves a .part file that the next
+# attempt resumes with a Range request when there is a checksum to verify the
+# joined result; without one the download starts over. sync_packages skips packages whose
+# CodeSha256 matches a sidecar index kept next to them, and stores each
+# distinct package once under code/.store/<sha256>.zip with the per-function
+# paths hardlinked to it, so identical packages are downloaded and kept once.
+# Store objects are read-only, and the index records each file's size, mtime
+# and inode so a package changed on disk is re-hashed rather than trusted.
+
+import base64
+import hashlib
+import json
+import os
+import random
+import shutil
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.concurrency import DEFAULT_WORKERS, parallel_map
+
+CHUNK_SIZE = 1024 * 1024
+MAX_ATTEMPTS = 4
+TIMEOUT = (10, 60)  # (connect, read) seconds
+
+# dummy_filename paths are relative to the Terraform root, one level up
+CODE_ROOT = ".."
+
+# Sidecar index of downloaded packages:
+# {path relative to the index: {"sha256", "size", "mtime_ns", "inode"}}
+INDEX_PATH = os.path.join(CODE_ROOT, "code", ".code_index.json")
+
+# Content-addressed package store: one file per distinct CodeSha256
+STORE_DIR = os.path.join(CODE_ROOT, "code", ".store")
+STORE_MODE = 0o444
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class ChecksumMismatch(Exception):
+    pass
+
+
+def get_session(max_workers=DEFAULT_WORKERS):
+    """Shared HTTP session whose connection pool fits max_workers downloads."""
+    with _sessions_lock:
+        session = _sessions.get(max_workers)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[max_workers] = session
+        return session
+
+
+def code_sha256(path):
+    """Base64 SHA-256 of a file, the format Lambda reports as CodeSha256."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return base64.b64encode(digest.digest()).decode("ascii")
+
+
+def _stream_to_part(session, url, part_path, resume=True):
+    """Write url to part_path, appending from its current size when resume is set."""
+    offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code == 416:
+            # Nothing left to fetch; the checksum decides whether the part is good
+            return
+        response.raise_for_status()
+        # 200 means the server ignored the range: start over
+        mode = "ab" if response.status_code == 206 else "wb"
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+
+
+def download_package(url, path, expected_sha256=None, session=None, max_attempts=MAX_ATTEMPTS):
+    """
+    Download url to path, verifying it against expected_sha256 when given.
+    url may be a callable returning a fresh URL, since presigned Lambda URLs
+    expire; it is called once per attempt. Returns True on success.
+    """
+    session = session or get_session()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    part_path = f"{path}.part"
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            # A leftover .part may belong to an older package; only resume when the result is verified
+            _stream_to_part(session, url() if callable(url) else url, part_path, resume=bool(expected_sha256))
+            if expected_sha256:
+                actual = code_sha256(part_path)
+                if actual != expected_sha256:
+                    os.remove(part_path)
+                    raise ChecksumMismatch(f"expected {expected_sha256}, got {actual}")
+            os.replace(part_path, path)
+            return True
+        except (requests.RequestException, ChecksumMismatch, OSError) as e:
+            if attempt == max_attempts:
+                print(f"⚠️ Failed to download {path} after {attempt} attempts: {e}")
+                return False
+            time.sleep(random.uniform(0, min(10, 0.5 * 2 ** attempt)))
+    return False
+
+
+def download_packages(jobs, max_workers=DEFAULT_WORKERS):
+    """
+    Download many packages concurrently.
+    jobs: list of {"url": str or callable, "path": str, "sha256": str or None}
+    Returns {path: True/False}.
+    """
+    session = get_session(max_workers)
+    results = parallel_map(
+        lambda job: download_package(job["url"], job["path"], job.get("sha256"), session=session),
+        jobs,
+        max_workers=max_workers,
+    )
+    return {job["path"]: ok for job, ok in zip(jobs, results)}
+
+
+# -----------------------
+# Skip-if-unchanged sync
+# -----------------------
+def load_index(index_path=INDEX_PATH):
+    try:
+        with open(index_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring unreadable package index {index_path}: {e}")
+        return {}
+
+
+def save_index(index, index_path=INDEX_PATH):
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dict(sorted(index.items())), f, indent=2)
+    os.replace(tmp_path, index_path)
+
+
+def _index_key(path, index_path):
+    return os.path.relpath(path, os.path.dirname(index_path) or ".")
+
+
+def _file_stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+
+def index_entry(path, expected_sha256):
+    """Index record for a verified package: its CodeSha256 and the file's stat."""
+    return {"sha256": expected_sha256, **_file_stat(path)}
+
+
+def _entry_sha256(entry):
+    # Older indexes stored the bare CodeSha256
+    return entry.get("sha256") if isinstance(entry, dict) else entry
+
+
+def _entry_matches_file(entry, path):
+    """True when the file still has the size, mtime and inode recorded for it."""
+    if not isinstance(entry, dict):
+        return False
+    stat = _file_stat(path)
+    return all(entry.get(field) == value for field, value in stat.items())
+
+
+def is_current(job, index, index_path=INDEX_PATH):
+    """
+    True when the package on disk already matches the job's CodeSha256.
+    The index is trusted only while the file's stat is unchanged; otherwise
+    the file is hashed again and its entry refreshed or dropped.
+    """
+    expected = job.get("sha256")
+    path = job["path"]
+    key = _index_key(path, index_path)
+    if not expected or not os.path.exists(path):
+        return False
+    entry = index.get(key)
+    if entry is not None and _entry_matches_file(entry, path):
+        return _entry_sha256(entry) == expected
+    # New, pre-stat or modified files are hashed once and (re)adopted
+    if code_sha256(path) == expected:
+        index[key] = index_entry(path, expected)
+        return True
+    index.pop(key, None)
+    return False
+
+
+def indexed_sha256(path, index, index_path=INDEX_PATH):
+    """
+    CodeSha256 the index recorded for path when it was verified, provided the
+    file is still there with the same size, mtime and inode; None otherwise.
+    """
+    if not os.path.exists(path):
+        return None
+    entry = index.get(_index_key(path, index_path))
+    if entry is None or not _entry_matches_file(entry, path):
+        return None
+    return _entry_sha256(entry)
+
+
+# -----------------------
+# Content-addressed store
+# -----------------------
+def store_path(expected_sha256, store_dir=STORE_DIR):
+    """Store location for a base64 CodeSha256 (hex-encoded, as base64 may contain '/')."""
+    return os.path.join(store_dir, base64.b64decode(expected_sha256).hex() + ".zip")
+
+
+def _link(source, path):
+    """Atomically make path a hardlink to source, copying where links are unsupported."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.link"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _seal(obj):
+    """Make a store object read-only, so its hardlinks cannot be rewritten in place."""
+    os.chmod(obj, STORE_MODE)
+
+
+def _store_object_ok(expected_sha256, store_dir=STORE_DIR):
+    """True when the store holds an intact object for expected_sha256; damaged objects are removed."""
+    obj = store_path(expected_sha256, store_dir)
+    if not os.path.exists(obj):
+        return False
+    if code_sha256(obj) == expected_sha256:
+        return True
+    print(f"⚠️ Discarding damaged package store object {obj}")
+    os.remove(obj)
+    return False
+
+
+def adopt_into_store(path, expected_sha256, store_dir=STORE_DIR):
+    """Make a verified per-function package share its bytes with the store."""
+    obj = store_path(expected_sha256, store_dir)
+    if os.path.exists(obj) and os.path.samefile(obj, path):
+        return
+    if _store_object_ok(expected_sha256, store_dir):
+        _link(obj, path)
+    else:
+        os.makedirs(store_dir, exist_ok=True)
+        _link(path, obj)
+    _seal(obj)
+
+
+def sync_packages(jobs, index_path=INDEX_PATH, max_workers=DEFAULT_WORKERS, store_dir=STORE_DIR):
+    """
+    Download only the packages whose CodeSha256 differs from the sidecar
+    index (or that are missing), then record the new checksums. Each
+    distinct checksum is downloaded once into the store and hardlinked to
+    every function path that uses it.
+    Returns {path: True/False} for the packages that were brought up to date.
+    """
+    index = load_index(index_path)
+    stale = []
+    for job in jobs:
+        if is_current(job, index, index_path):
+            adopt_into_store(job["path"], job["sha256"], store_dir)
+            # Adoption may relink the path, so record the stat it ends up with
+            index[_index_key(job["path"], index_path)] = index_entry(job["path"], job["sha256"])
+        else:
+            stale.append(job)
+
+    by_sha = {}
+    direct = []
+    for job in stale:
+        if job.get("sha256"):
+            by_sha.setdefault(job["sha256"], []).append(job)
+        else:
+            direct.append(job)
+    downloads = [
+        {"url": group[0]["url"], "path": store_path(sha, store_dir), "sha256": sha}
+        for sha, group in by_sha.items()
+        if not _store_object_ok(sha, store_dir)
+    ]
+    print(
+        f"Lambda packages: {len(jobs) - len(stale)} unchanged, {len(stale)} to update, "
+        f"{len(downloads) + len(direct)} to download"
+    )
+
+    downloaded = download_packages(downloads + direct, max_workers=max_workers)
+    results = {job["path"]: downloaded[job["path"]] for job in direct}
+    for sha, group in by_sha.items():
+        obj = store_path(sha, store_dir)
+        if os.path.exists(obj):
+            _seal(obj)
+        for job in group:
+            results[job["path"]] = os.path.exists(obj)
+            if results[job["path"]]:
+                _link(obj, job["path"])
+
+    for job in stale:
+        key = _index_key(job["path"], index_path)
+        if results[job["path"]] and job.get("sha256"):
+            index[key] = index_entry(job["path"], job["sha256"])
+        else:
+            index.pop(key, None)
+    save_index(index, index_path)
+    return results
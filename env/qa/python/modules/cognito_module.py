@@ -1,10 +1,13 @@
 # modules/cognito_module.py
 
-import boto3
+import threading
+
 from botocore.exceptions import ClientError
+from modules.aws_clients import lazy_client
+from modules.concurrency import parallel_map
 
-cognito_idp = boto3.client("cognito-idp")
-cognito_identity = boto3.client("cognito-identity")
+cognito_idp = lazy_client("cognito-idp")
+cognito_identity = lazy_client("cognito-identity")
 
 
 def get_user_pool_config(pool_id):
@@ -68,23 +71,91 @@ def get_identity_pool_config(identity_pool_id):
         return None
 
 
-def find_user_pool_for_client(client_id):
-    """Brute force search to find which User Pool owns the given client_id."""
+def list_user_pool_ids():
+    pool_ids = []
+    paginator = cognito_idp.get_paginator("list_user_pools")
+    for page in paginator.paginate(MaxResults=60):
+        for pool in page["UserPools"]:
+            pool_ids.append(pool["Id"])
+    return pool_ids
+
+
+def list_client_ids_for_pool(pool_id):
+    client_ids = []
     try:
-        paginator = cognito_idp.get_paginator("list_user_pools")
-        for page in paginator.paginate(MaxResults=60):
-            for pool in page["UserPools"]:
-                pool_id = pool["Id"]
-                try:
-                    _ = cognito_idp.describe_user_pool_client(
-                        UserPoolId=pool_id,
-                        ClientId=client_id
-                    )
-                    return pool_id  # Found the pool
-                except ClientError as e:
-                    if e.response["Error"]["Code"] != "ResourceNotFoundException":
-                        print(f"⚠️ Unexpected error while checking pool {pool_id}: {e}")
-                    continue
-    except Exception as e:
-        print(f"⚠️ Error finding user pool for client {client_id}: {e}")
+        paginator = cognito_idp.get_paginator("list_user_pool_clients")
+        for page in paginator.paginate(UserPoolId=pool_id, MaxResults=60):
+            for client in page.get("UserPoolClients", []):
+                client_ids.append(client["ClientId"])
+    except ClientError as e:
+        print(f"⚠️ Error listing clients for user pool {pool_id}: {e}")
+        raise
+    return client_ids
+
+
+# client id -> pool id, built once per run and shared by every client lookup.
+# Pools whose client listing failed stay out of _pool_clients and are listed
+# again on the next lookup; the index is only memoised once it is complete.
+_pool_ids = None
+_pool_clients = {}
+_client_pool_index = None
+_client_pool_index_lock = threading.Lock()
+
+
+def _list_client_ids_safe(pool_id):
+    try:
+        return list_client_ids_for_pool(pool_id), None
+    except ClientError as e:
+        return None, e
+
+
+def get_client_pool_index():
+    """
+    (index, error): the client id -> pool id index over every pool listed so
+    far, and the first listing error when some pools could not be listed.
+    """
+    global _pool_ids, _client_pool_index
+    with _client_pool_index_lock:
+        if _client_pool_index is not None:
+            return _client_pool_index, None
+        if _pool_ids is None:
+            _pool_ids = list_user_pool_ids()
+
+        missing = [pool_id for pool_id in _pool_ids if pool_id not in _pool_clients]
+        errors = []
+        for pool_id, (client_ids, error) in zip(missing, parallel_map(_list_client_ids_safe, missing, max_workers=2)):
+            if error is None:
+                _pool_clients[pool_id] = client_ids
+            else:
+                errors.append(error)
+
+        index = {}
+        for pool_id in _pool_ids:
+            for client_id in _pool_clients.get(pool_id, []):
+                index[client_id] = pool_id
+        if errors:
+            return index, errors[0]
+        _client_pool_index = index
+        return index, None
+
+
+def find_user_pool_for_client(client_id):
+    """
+    Find which User Pool owns the given client_id. Raises the listing error
+    when the client is not found and some pools could not be listed.
+    """
+    index, error = get_client_pool_index()
+    if client_id in index:
+        return index[client_id]
+    if error is not None:
+        raise error
     return None
+
+
+def get_user_pool_client_config_by_id(client_id):
+    """Resolve the owning pool for a CloudFormation UserPoolClient id, then describe it."""
+    pool_id = find_user_pool_for_client(client_id)
+    if not pool_id:
+        print(f"WARNING Skipped UserPoolClient {client_id} (no parent pool found)")
+        return None
+    return get_user_pool_client_config(pool_id, client_id)
@@ -0,0 +1,22 @@
+# modules/concurrency.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 8
+
+
+def parallel_map(func, items, max_workers=DEFAULT_WORKERS):
+    """
+    Run func over items on a bounded thread pool.
+    Results are returned in input order so callers can merge deterministically.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    workers = max(1, min(max_workers or 1, len(items)))
+    if workers == 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, items))
@@ -1,6 +1,8 @@
-import boto3
 import datetime
+import threading
+
 from botocore.exceptions import ClientError
+from modules.aws_clients import get_client
 
 
 def json_safe(data):
@@ -15,76 +17,119 @@ def json_safe(data):
 
 
 def get_config_client():
-    return boto3.client("config")
+    return get_client("config")
+
+
+class ConfigInventory:
+    """
+    Snapshot of the account's AWS Config recorders, delivery channels and
+    rules with their statuses and compliance. Each describe call runs once,
+    paginated where the API allows, and results are indexed by name. Failed
+    calls are not remembered, so the next lookup retries them.
+    """
+
+    def __init__(self):
+        self._lists = {}
+        self._lock = threading.Lock()
+
+    def _indexed(self, kind, load, name_key="name"):
+        with self._lock:
+            if kind not in self._lists:
+                try:
+                    items = load()
+                except ClientError as e:
+                    # Not memoised: the caller's item fails and a later lookup tries again
+                    print(f"❌ Error describing {kind}: {e}")
+                    raise
+                self._lists[kind] = {item[name_key]: json_safe(item) for item in items}
+            return self._lists[kind]
+
+    def recorders(self):
+        return self._indexed("configuration recorders", lambda: (
+            get_config_client().describe_configuration_recorders().get("ConfigurationRecorders", [])
+        ))
+
+    def recorder_statuses(self):
+        return self._indexed("configuration recorder status", lambda: (
+            get_config_client().describe_configuration_recorder_status().get("ConfigurationRecordersStatus", [])
+        ))
+
+    def delivery_channels(self):
+        return self._indexed("delivery channels", lambda: (
+            get_config_client().describe_delivery_channels().get("DeliveryChannels", [])
+        ))
+
+    def delivery_channel_statuses(self):
+        return self._indexed("delivery channel status", lambda: (
+            get_config_client().describe_delivery_channel_status().get("DeliveryChannelsStatus", [])
+        ))
+
+    def rules(self):
+        return self._indexed("config rules", lambda: _paginate(
+            "describe_config_rules", "ConfigRules"
+        ), name_key="ConfigRuleName")
+
+    def rule_compliance(self):
+        return self._indexed("config rule compliance", lambda: _paginate(
+            "describe_compliance_by_config_rule", "ComplianceByConfigRules"
+        ), name_key="ConfigRuleName")
+
+
+def _paginate(operation, result_key):
+    items = []
+    paginator = get_config_client().get_paginator(operation)
+    for page in paginator.paginate():
+        items.extend(page.get(result_key, []))
+    return items
+
+
+_inventory = ConfigInventory()
+
+
+def get_inventory():
+    return _inventory
 
 
 def get_config_recorder_config(rid):
-    client = get_config_client()
-    try:
-        response = client.describe_configuration_recorders()
-        for rec in response.get("ConfigurationRecorders", []):
-            if rec["name"] == rid:
-                return json_safe(rec)
-    except ClientError as e:
-        print(f"❌ Error getting recorder config for {rid}: {e}")
-    return None
+    return get_inventory().recorders().get(rid)
 
 
 def get_config_recorder_status(rid):
-    client = get_config_client()
-    try:
-        response = client.describe_configuration_recorder_status()
-        for status in response.get("ConfigurationRecordersStatus", []):
-            if status["name"] == rid:
-                return json_safe(status)
-    except ClientError as e:
-        print(f"❌ Error getting recorder status for {rid}: {e}")
-    return None
+    return get_inventory().recorder_statuses().get(rid)
 
 
 def get_delivery_channel_config(rid):
-    client = get_config_client()
-    try:
-        response = client.describe_delivery_channels()
-        for ch in response.get("DeliveryChannels", []):
-            if ch["name"] == rid:
-                return json_safe(ch)
-    except ClientError as e:
-        print(f"❌ Error getting delivery channel for {rid}: {e}")
-    return None
+    return get_inventory().delivery_channels().get(rid)
 
 
 def get_delivery_channel_status(rid):
-    client = get_config_client()
-    try:
-        response = client.describe_delivery_channel_status()
-        for status in response.get("DeliveryChannelsStatus", []):
-            if status["name"] == rid:
-                return json_safe(status)
-    except ClientError as e:
-        print(f"❌ Error getting delivery channel status for {rid}: {e}")
-    return None
+    return get_inventory().delivery_channel_statuses().get(rid)
 
 
 def get_config_rule_config(rid):
-    client = get_config_client()
-    try:
-        response = client.describe_config_rules()
-        for rule in response.get("ConfigRules", []):
-            if rule["ConfigRuleName"] == rid:
-                return json_safe(rule)
-    except ClientError as e:
-        print(f"❌ Error getting config rule {rid}: {e}")
-    return None
+    return get_inventory().rules().get(rid)
 
 
 def get_rule_compliance(rid):
-    client = get_config_client()
-    try:
-        response = client.describe_compliance_by_config_rule(ConfigRuleNames=[rid])
-        for c in response.get("ComplianceByConfigRules", []):
-            if c["ConfigRuleName"] == rid:
-                return json_safe(c)
-    except ClientError as e:
-        print(f"❌ Error getting compliance for rule {rid}: {e}")
-    return None
+    return get_inventory().rule_compliance().get(rid)
+
+
+def get_config_recorder_with_status(rid):
+    recorder_config = get_config_recorder_config(rid)
+    if not recorder_config:
+        return None
+    return {"config": recorder_config, "status": get_config_recorder_status(rid)}
+
+
+def get_delivery_channel_with_status(rid):
+    channel_config = get_delivery_channel_config(rid)
+    if not channel_config:
+        return None
+    return {"config": channel_config, "status": get_delivery_channel_status(rid)}
+
+
+def get_config_rule_with_compliance(rid):
+    rule_config = get_config_rule_config(rid)
+    if not rule_config:
+        return None
+    return {"config": rule_config, "compliance": get_rule_compliance(rid)}
@@ -0,0 +1,71 @@
+# modules/discovery_manifest.py
+#
+# Per-stack record of the last discovery run: when each stack last changed,
+# its drift status and the tfvars entries its resources produced. An
+# incremental run only re-enumerates stacks whose record no longer matches and
+# merges the rest straight from the manifest.
+
+import json
+import os
+
+DEFAULT_MANIFEST_PATH = "discovery_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def load_manifest(path=DEFAULT_MANIFEST_PATH):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {"version": MANIFEST_VERSION, "stacks": {}}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring unreadable manifest {path}: {e}")
+        return {"version": MANIFEST_VERSION, "stacks": {}}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        print(f"⚠️ Ignoring manifest {path} written by an incompatible version")
+        return {"version": MANIFEST_VERSION, "stacks": {}}
+    return manifest
+
+
+def save_manifest(manifest, path=DEFAULT_MANIFEST_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def is_unchanged(summary, record):
+    """A stack can be reused when its change time matches and it has not drifted."""
+    if not record or record.get("last_updated") is None:
+        return False
+    if summary["drift_status"] == "DRIFTED":
+        return False
+    return (
+        record.get("last_updated") == summary["last_updated"]
+        and record.get("drift_status") == summary["drift_status"]
+    )
+
+
+def split_stacks(summaries, manifest):
+    """Return (changed, unchanged) stack names, each in listing order."""
+    changed, unchanged = [], []
+    for summary in summaries:
+        record = manifest["stacks"].get(summary["name"])
+        if is_unchanged(summary, record):
+            unchanged.append(summary["name"])
+        else:
+            changed.append(summary["name"])
+    return changed, unchanged
+
+
+def stack_record(summary, outputs, failed=False):
+    """
+    Manifest entry for a stack. A stack with a failed listing or fetch is
+    recorded with no change time, so the next incremental run re-describes it.
+    """
+    return {
+        "last_updated": None if failed else summary["last_updated"],
+        "drift_status": summary["drift_status"],
+        "outputs": outputs,
+    }
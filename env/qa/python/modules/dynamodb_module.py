@@ -1,5 +1,5 @@
-import boto3
-dynamodb = boto3.client("dynamodb")
+from modules.aws_clients import lazy_client
+dynamodb = lazy_client("dynamodb")
 
 # -----------------------
 # Function: Get DynamoDB table config
@@ -1,8 +1,8 @@
-import boto3
 from botocore.exceptions import ClientError
 import json
+from modules.aws_clients import lazy_client
 
-events = boto3.client("events")
+events = lazy_client("events")
 
 # -----------------------
 # Function: Get EventBridge rule config
@@ -0,0 +1,120 @@
+# modules/fetch_scheduler.py
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.concurrency import DEFAULT_WORKERS, parallel_map
+
+# Services that throttle aggressively get smaller pools than the default
+SERVICE_WORKERS = {
+    "apigateway": 2,
+    "cognito-idp": 2,
+    "iam": 4,
+}
+
+
+def collect_work_items(stacks, stack_resources, registry, types=None):
+    """
+    Flatten stack resources into unique (resource type, physical id) work items
+    for every type the registry knows how to fetch, in first-seen stack order.
+    types optionally restricts the run to a subset of resource types.
+
+    Nested stacks and StackSets surface the same physical resource under
+    several stacks; it becomes one work item, so it is described once per run.
+    Returns (work_items, references) where references maps each work item to
+    the stacks that declare it.
+    """
+    references = {}
+    for stack in stacks:
+        for res in stack_resources.get(stack) or []:
+            # Skip deleted resources
+            if res["ResourceStatus"] == "DELETE_COMPLETE":
+                continue
+            if types and res["ResourceType"] not in types:
+                continue
+            if res["ResourceType"] not in registry:
+                continue
+            item = (res["ResourceType"], res["PhysicalResourceId"])
+            stacks_for_item = references.setdefault(item, [])
+            if stack not in stacks_for_item:
+                stacks_for_item.append(stack)
+    return list(references), references
+
+
+def run_fetches(work_items, outputs, registry, workers=DEFAULT_WORKERS, service_workers=None):
+    """
+    Run the registered fetcher for every work item on per-service thread pools
+    and merge results into outputs in work-item order.
+    Returns (item_outputs, failed): item_outputs maps each work item to the
+    {bucket: {key: config}} entries it produced; failed lists the items whose
+    fetcher raised. A fetcher returning None (resource missing or unsupported)
+    is a legitimate empty result, not a failure.
+    """
+    limits = dict(SERVICE_WORKERS)
+    limits.update(service_workers or {})
+
+    item_outputs = {}
+    failed = []
+    phases = sorted({registry[rtype].phase for rtype, _ in work_items})
+    for phase in phases:
+        phase_items = [(rtype, rid) for rtype, rid in work_items if registry[rtype].phase == phase]
+        _run_phase(phase_items, outputs, registry, workers, limits, item_outputs, failed)
+    return item_outputs, failed
+
+
+def merge_outputs(outputs, produced):
+    """Merge {bucket: {key: config}} entries into outputs."""
+    for bucket, entries in produced.items():
+        outputs[bucket].update(entries)
+
+
+def _run_prefetches(work_items, registry, workers):
+    """Give handlers with a prefetch hook every rid of their type, concurrently per type."""
+    rids_by_type = {}
+    for rtype, rid in work_items:
+        if registry[rtype].prefetch_ref:
+            rids_by_type.setdefault(rtype, []).append(rid)
+
+    def prefetch(rtype):
+        try:
+            registry[rtype].prefetch(rids_by_type[rtype])
+        except Exception as e:
+            print(f"⚠️ Error prefetching {rtype}: {e}")
+
+    parallel_map(prefetch, list(rids_by_type), max_workers=workers)
+
+
+def _run_phase(work_items, outputs, registry, workers, limits, item_outputs, failed):
+    _run_prefetches(work_items, registry, workers)
+
+    executors = {}
+    submitted = []
+    try:
+        for rtype, rid in work_items:
+            handler = registry[rtype]
+            pool = executors.get(handler.service)
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=max(1, min(workers, limits.get(handler.service, workers))),
+                    thread_name_prefix=f"fetch-{handler.service}",
+                )
+                executors[handler.service] = pool
+            submitted.append((rtype, rid, handler, pool.submit(handler.fetch, rid, outputs)))
+
+        # Merge on the calling thread so output order never depends on timing
+        for rtype, rid, handler, future in submitted:
+            try:
+                config = future.result()
+            except Exception as e:
+                print(f"⚠️ Error fetching {rtype} {rid}: {e}")
+                failed.append((rtype, rid))
+                continue
+            # Store into a scratch set of buckets first to know what this item produced
+            produced = defaultdict(dict)
+            handler.store(produced, rid, config)
+            produced = {bucket: entries for bucket, entries in produced.items() if entries}
+            merge_outputs(outputs, produced)
+            item_outputs[(rtype, rid)] = produced
+    finally:
+        for pool in executors.values():
+            pool.shutdown(wait=True)
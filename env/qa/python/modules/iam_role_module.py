@@ -1,9 +1,102 @@
-import boto3
 import json
+import threading
+
 from botocore.exceptions import ClientError
+from modules.aws_clients import lazy_client
+from modules.managed_policy_cache import get_managed_policy_cache
 
 # Initialize the IAM client
-iam = boto3.client("iam")
+iam = lazy_client("iam")
+
+# Below this many entities of a kind in a run, per-entity calls are cheaper than the bulk download
+BULK_THRESHOLD = 10
+
+
+class IamAuthorizationDetails:
+    """
+    In-memory index of the account's IAM entities, loaded with the paginated
+    GetAccountAuthorizationDetails call (roles, users, groups and customer
+    managed policies with their inline policies, attachments and policy
+    versions). Roles are topped up from ListRoles, which is the only bulk
+    source of Description and MaxSessionDuration. Each entity kind is
+    downloaded once, on first use.
+    """
+
+    def __init__(self):
+        self._kinds = {}
+        self._lock = threading.Lock()
+
+    def _load(self, kind, filters, list_key, name_key):
+        with self._lock:
+            if kind not in self._kinds:
+                index = {}
+                paginator = iam.get_paginator("get_account_authorization_details")
+                for page in paginator.paginate(Filter=filters):
+                    for item in page.get(list_key, []):
+                        index[item[name_key]] = item
+                if kind == "roles":
+                    for page in iam.get_paginator("list_roles").paginate():
+                        for role in page.get("Roles", []):
+                            if role["RoleName"] in index:
+                                index[role["RoleName"]]["Description"] = role.get("Description", "")
+                                index[role["RoleName"]]["MaxSessionDuration"] = role.get("MaxSessionDuration", 3600)
+                if kind == "managed_policies":
+                    # Policy versions come with their documents; share them with other exporters
+                    cache = get_managed_policy_cache()
+                    for arn, policy in index.items():
+                        for version in policy.get("PolicyVersionList", []):
+                            if version.get("Document"):
+                                cache.seed_document(arn, version["VersionId"], version["Document"])
+                self._kinds[kind] = index
+            return self._kinds[kind]
+
+    def is_loaded(self, kind):
+        return kind in self._kinds
+
+    def roles(self):
+        return self._load("roles", ["Role"], "RoleDetailList", "RoleName")
+
+    def users(self):
+        return self._load("users", ["User"], "UserDetailList", "UserName")
+
+    def groups(self):
+        return self._load("groups", ["Group"], "GroupDetailList", "GroupName")
+
+    def managed_policies(self):
+        return self._load("managed_policies", ["LocalManagedPolicy"], "Policies", "Arn")
+
+
+_details = IamAuthorizationDetails()
+
+
+def get_authorization_details():
+    return _details
+
+
+def _prefetch(kind, load, names):
+    """Switch the run to bulk mode for a kind when enough of it is requested."""
+    if len(names) >= BULK_THRESHOLD:
+        try:
+            load()
+        except ClientError as e:
+            print(f"⚠️ Bulk IAM {kind} download failed, falling back to per-{kind} calls: {e}")
+
+
+def prefetch_roles(role_names):
+    _prefetch("role", get_authorization_details().roles, role_names)
+
+
+def prefetch_users(user_names):
+    _prefetch("user", get_authorization_details().users, user_names)
+
+
+def prefetch_groups(group_names):
+    _prefetch("group", get_authorization_details().groups, group_names)
+
+
+def prefetch_managed_policies(policy_arns):
+    _prefetch("policy", get_authorization_details().managed_policies, policy_arns)
+
 
 def get_iam_role_config(role_name, role_key=None):
     """
@@ -13,20 +106,24 @@ def get_iam_role_config(role_name, role_key=None):
     role_config: dict for the role itself
     inline_policies_map: dict keyed by "role_id|policy_name" for inline policies
     """
+    # Use provided role_key or sanitize role_name as the key
+    if not role_key:
+        role_key = role_name.replace("-", "_").replace(".", "_")
+
+    details = get_authorization_details()
+    if details.is_loaded("roles") and role_name in details.roles():
+        role = details.roles()[role_name]
+        attached_policy_arns = [policy["PolicyArn"] for policy in role.get("AttachedManagedPolicies", [])]
+        inline_documents = [
+            (policy["PolicyName"], policy.get("PolicyDocument", {})) for policy in role.get("RolePolicyList", [])
+        ]
+        return build_role_config(role, role_key, attached_policy_arns, inline_documents)
+
     try:
         # Base role details
         role_response = iam.get_role(RoleName=role_name)
         role = role_response["Role"]
 
-        # Use provided role_key or sanitize role_name as the key
-        if not role_key:
-            role_key = role_name.replace("-", "_").replace(".", "_")
-
-        # Permissions boundary ARN (if any)
-        permissions_boundary_arn = None
-        if role.get("PermissionsBoundary"):
-            permissions_boundary_arn = role["PermissionsBoundary"].get("PermissionsBoundaryArn")
-
         # Collect attached managed policy ARNs with pagination
         attached_policy_arns = []
         paginator = iam.get_paginator("list_attached_role_policies")
@@ -35,68 +132,84 @@ def get_iam_role_config(role_name, role_key=None):
                 attached_policy_arns.append(policy["PolicyArn"])
 
         # Collect inline policies separately
-        inline_policies_map = {}
+        inline_documents = []
         list_inline_policies_paginator = iam.get_paginator("list_role_policies")
         for page in list_inline_policies_paginator.paginate(RoleName=role_name):
             for policy_name in page.get("PolicyNames", []):
                 inline_resp = iam.get_role_policy(RoleName=role_name, PolicyName=policy_name)
-                doc = inline_resp.get("PolicyDocument", {})
-                
-                # Normalize and convert to JSON string for consistent Terraform typing
-                normalized_doc = normalize_policy_document(doc)
-                policy_json = json.dumps(normalized_doc, sort_keys=True)
-                
-                # Key format: role_id|policy_name
-                policy_key = f"{role_key}|{policy_name}"
-                inline_policies_map[policy_key] = {
-                    "role_id": role_key,
-                    "policy_name": policy_name,
-                    "policy_json": policy_json
-                }
-
-        # Convert AWS tag list to map(string)
-        tags_map = tags_list_to_map(role.get("Tags", []))
-
-        # Normalize assume role policy to JSON string
-        assume_role_policy_json = json.dumps(
-            normalize_policy_document(role["AssumeRolePolicyDocument"]), 
-            sort_keys=True
-        )
-
-        # Shape for Terraform module input (role only, no inline policies)
-        tf_role = {
-            "role_name": role["RoleName"],
-            "path": role.get("Path", "/"),
-            "assume_role_policy": assume_role_policy_json,
-            "description": role.get("Description", ""),
-            "max_session_duration": role.get("MaxSessionDuration", 3600),
-            "tags": tags_map,
-            "attached_managed_policies": attached_policy_arns,
-        }
+                inline_documents.append((policy_name, inline_resp.get("PolicyDocument", {})))
 
-        if permissions_boundary_arn:
-            tf_role["permissions_boundary"] = permissions_boundary_arn
-
-        return (tf_role, inline_policies_map)
+        return build_role_config(role, role_key, attached_policy_arns, inline_documents)
     except ClientError as e:
         print(f"⚠️ Failed to get IAM role {role_name}: {e}")
         return (None, {})
 
+
+def build_role_config(role, role_key, attached_policy_arns, inline_documents):
+    """Shape a role (from GetRole or the bulk index) into (tf_role, inline_policies_map)."""
+    # Permissions boundary ARN (if any)
+    permissions_boundary_arn = None
+    if role.get("PermissionsBoundary"):
+        permissions_boundary_arn = role["PermissionsBoundary"].get("PermissionsBoundaryArn")
+
+    inline_policies_map = {}
+    for policy_name, doc in inline_documents:
+        # Normalize and convert to JSON string for consistent Terraform typing
+        normalized_doc = normalize_policy_document(doc)
+        policy_json = json.dumps(normalized_doc, sort_keys=True)
+
+        # Key format: role_id|policy_name
+        policy_key = f"{role_key}|{policy_name}"
+        inline_policies_map[policy_key] = {
+            "role_id": role_key,
+            "policy_name": policy_name,
+            "policy_json": policy_json
+        }
+
+    # Convert AWS tag list to map(string)
+    tags_map = tags_list_to_map(role.get("Tags", []))
+
+    # Normalize assume role policy to JSON string
+    assume_role_policy_json = json.dumps(
+        normalize_policy_document(role["AssumeRolePolicyDocument"]), 
+        sort_keys=True
+    )
+
+    # Shape for Terraform module input (role only, no inline policies)
+    tf_role = {
+        "role_name": role["RoleName"],
+        "path": role.get("Path", "/"),
+        "assume_role_policy": assume_role_policy_json,
+        "description": role.get("Description", ""),
+        "max_session_duration": role.get("MaxSessionDuration", 3600),
+        "tags": tags_map,
+        "attached_managed_policies": attached_policy_arns,
+    }
+
+    if permissions_boundary_arn:
+        tf_role["permissions_boundary"] = permissions_boundary_arn
+
+    return (tf_role, inline_policies_map)
+
 def get_iam_user_config(user_name):
     """Fetch the IAM user configuration."""
+    details = get_authorization_details()
+    if details.is_loaded("users") and user_name in details.users():
+        user = details.users()[user_name]
+        user_config = build_principal_config(user, "user")
+        user_config["attached_policies"] = [
+            {"policy_name": policy["PolicyName"], "policy_arn": policy["PolicyArn"]}
+            for policy in user.get("AttachedManagedPolicies", [])
+        ]
+        return user_config
+
     try:
         # Get user details
         user_response = iam.get_user(UserName=user_name)
         user = user_response["User"]
 
         # Extract user information
-        user_config = {
-            "user_name": user["UserName"],
-            "user_id": user["UserId"],
-            "arn": user["Arn"],
-            "create_date": user["CreateDate"].isoformat(),
-            "tags": format_tags(user.get("Tags", [])),
-        }
+        user_config = build_principal_config(user, "user")
 
         # Get attached policies for the user
         attached_policies = iam.list_attached_user_policies(UserName=user_name)["AttachedPolicies"]
@@ -111,19 +224,23 @@ def get_iam_user_config(user_name):
 
 def get_iam_group_config(group_name):
     """Fetch the IAM group configuration."""
+    details = get_authorization_details()
+    if details.is_loaded("groups") and group_name in details.groups():
+        group = details.groups()[group_name]
+        group_config = build_principal_config(group, "group")
+        group_config["attached_policies"] = [
+            {"policy_name": policy["PolicyName"], "policy_arn": policy["PolicyArn"]}
+            for policy in group.get("AttachedManagedPolicies", [])
+        ]
+        return group_config
+
     try:
         # Get group details
         group_response = iam.get_group(GroupName=group_name)
         group = group_response["Group"]
 
         # Extract group information
-        group_config = {
-            "group_name": group["GroupName"],
-            "group_id": group["GroupId"],
-            "arn": group["Arn"],
-            "create_date": group["CreateDate"].isoformat(),
-            "tags": format_tags(group.get("Tags", [])),
-        }
+        group_config = build_principal_config(group, "group")
 
         # Get attached policies for the group
         attached_policies = iam.list_attached_group_policies(GroupName=group_name)["AttachedPolicies"]
@@ -138,10 +255,32 @@ def get_iam_group_config(group_name):
 
 def get_iam_managed_policy_config(policy_arn):
     """Fetch the IAM managed policy configuration."""
+    details = get_authorization_details()
+    if details.is_loaded("managed_policies") and policy_arn in details.managed_policies():
+        policy = details.managed_policies()[policy_arn]
+        try:
+            # The bulk listing carries no tags
+            tags = iam.list_policy_tags(PolicyArn=policy_arn).get("Tags", [])
+        except ClientError as e:
+            print(f"⚠️ Failed to get tags for IAM policy {policy_arn}: {e}")
+            tags = []
+        return {
+            "policy_name": policy["PolicyName"],
+            "policy_id": policy["PolicyId"],
+            "arn": policy["Arn"],
+            "default_version_id": policy["DefaultVersionId"],
+            "attachment_count": policy["AttachmentCount"],
+            "create_date": policy["CreateDate"].isoformat(),
+            "tags": format_tags(tags),
+            "versions": [
+                {"version_id": version["VersionId"], "is_default_version": version["IsDefaultVersion"]}
+                for version in policy.get("PolicyVersionList", [])
+            ],
+        }
+
     try:
-        # Get policy details
-        policy_response = iam.get_policy(PolicyArn=policy_arn)
-        policy = policy_response["Policy"]
+        # Get policy details (shared across every role, user and group it is attached to)
+        policy = get_managed_policy_cache().get_policy(policy_arn)
 
         # Extract policy information
         policy_config = {
@@ -165,6 +304,16 @@ def get_iam_managed_policy_config(policy_arn):
         print(f"⚠️ Failed to get IAM policy {policy_arn}: {e}")
         return None
 
+def build_principal_config(entity, kind):
+    """User or group fields shared by the per-entity and bulk paths."""
+    return {
+        f"{kind}_name": entity[f"{kind.capitalize()}Name"],
+        f"{kind}_id": entity[f"{kind.capitalize()}Id"],
+        "arn": entity["Arn"],
+        "create_date": entity["CreateDate"].isoformat(),
+        "tags": format_tags(entity.get("Tags", [])),
+    }
+
 def format_tags(tag_list):
     """Convert AWS tag list to Terraform-style list of maps."""
     return [{"Key": tag["Key"], "Value": tag["Value"]} for tag in tag_list]
@@ -1,8 +1,8 @@
-import boto3
 from botocore.exceptions import ClientError
 import json
+from modules.aws_clients import lazy_client
 
-kms = boto3.client("kms")
+kms = lazy_client("kms")
 
 # -----------------------
 # Function: Get KMS key config
@@ -1,8 +1,8 @@
-import boto3
 from botocore.exceptions import ClientError
 import json
+from modules.aws_clients import lazy_client
 
-lambda_client = boto3.client("lambda")
+lambda_client = lazy_client("lambda")
 
 # -----------------------
 # Function: Get Lambda layer config
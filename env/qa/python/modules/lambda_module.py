@@ -1,8 +1,76 @@
 import os
-import boto3
-from helpers import download_lambda_code
+import threading
+
+from modules.aws_clients import lazy_client
+from modules.code_downloader import CODE_ROOT, code_sha256, indexed_sha256, load_index, sync_packages
+from modules.concurrency import DEFAULT_WORKERS, parallel_map
+
+lambda_client = lazy_client("lambda")
+# get_function's presigned code URL expires within minutes, so it never goes through the response cache
+lambda_code_client = lazy_client("lambda", cache=False)
+
+# Concurrent list_aliases pagers while prefetching
+ALIAS_WORKERS = 8
+
+# -----------------------
+# Function inventory: one list_functions pass per run, indexed by name
+# -----------------------
+_functions = None
+_aliases = {}
+_inventory_lock = threading.Lock()
+
+
+def get_function_inventory():
+    """
+    {function name: configuration}. A failed list_functions pass is recorded
+    as an empty inventory, so lookups fall back to per-function get_function
+    calls instead of every worker re-running the scan under the lock.
+    """
+    global _functions
+    with _inventory_lock:
+        if _functions is None:
+            inventory = {}
+            try:
+                paginator = lambda_client.get_paginator("list_functions")
+                for page in paginator.paginate():
+                    for func in page.get("Functions", []):
+                        inventory[func["FunctionName"]] = func
+            except Exception as e:
+                print(f"⚠️ Failed to list Lambda functions, describing them one by one: {e}")
+                inventory = {}
+            _functions = inventory
+        return _functions
+
+
+def list_function_aliases(function_name):
+    if function_name not in _aliases:
+        aliases = []
+        paginator = lambda_client.get_paginator("list_aliases")
+        for page in paginator.paginate(FunctionName=function_name):
+            aliases.extend(page.get("Aliases", []))
+        _aliases[function_name] = aliases
+    return _aliases[function_name]
+
+
+def _list_function_aliases_safe(function_name):
+    try:
+        list_function_aliases(function_name)
+    except Exception as e:
+        print(f"⚠️ Failed to list aliases for Lambda {function_name}: {e}")
+
+
+def prefetch_functions(function_names):
+    """Load the inventory, then page aliases for the requested functions concurrently."""
+    inventory = get_function_inventory()
+    names = [name for name in function_names if name in inventory and name not in _aliases]
+    parallel_map(_list_function_aliases_safe, names, max_workers=ALIAS_WORKERS)
+
+
+def get_code_location(function_name):
+    """Presigned URL of the deployment package; only get_function returns it."""
+    response = lambda_code_client.get_function(FunctionName=function_name)
+    return response.get("Code", {}).get("Location")
 
-lambda_client = boto3.client("lambda")
 
 # -----------------------
 # Function: Get Lambda config
@@ -10,9 +78,10 @@ lambda_client = boto3.client("lambda")
 
 def get_lambda_config(function_name):
     try:
-        response = lambda_client.get_function(FunctionName=function_name)
-        func = response["Configuration"]
-        code = response.get("Code", {})
+        # list_functions returns the same configuration shape as get_function
+        func = get_function_inventory().get(function_name)
+        if func is None:
+            func = lambda_client.get_function(FunctionName=function_name)["Configuration"]
 
         # Get VPC config
         vpc_config = func.get("VpcConfig", {})
@@ -32,27 +101,19 @@ def get_lambda_config(function_name):
         layers = [layer["Arn"] for layer in func.get("Layers", [])]
 
         # Fetch aliases
-        aliases_response = lambda_client.list_aliases(FunctionName=function_name)
         aliases = [
             {
                 "name": alias["Name"],
                 "description": alias.get("Description", ""),
                 "function_version": alias.get("FunctionVersion")
             }
-            for alias in aliases_response.get("Aliases", [])
+            for alias in list_function_aliases(function_name)
         ]
 
-        # Download code if Zip type
+        # Zip packages get a local code path; download_function_code fills it in
         local_code_path = None
-        if func.get("PackageType") == "Zip" and "Location" in code:
-            os.makedirs("code", exist_ok=True)
+        if func.get("PackageType") == "Zip":
             local_code_path = f"code/{function_name}.zip"
-            try:
-                print('')
-                # download_lambda_code(code["Location"], local_code_path)
-            except Exception as e:
-                print(f"⚠️ Failed to download Lambda code: {e}")
-                local_code_path = None
 
         return {
             "function_name": func["FunctionName"],
@@ -85,3 +146,46 @@ def get_lambda_config(function_name):
     except Exception as e:
         print(f"⚠️ Error fetching Lambda {function_name}: {e}")
         return None
+
+
+# -----------------------
+# Function: Download Lambda code
+# -----------------------
+def download_function_code(functions, max_workers=DEFAULT_WORKERS):
+    """
+    Bring the deployment package of every Zip function in functions (the
+    all_lambdas map) up to date at its dummy_filename, verified against
+    code_sha256. Packages whose checksum is unchanged are not downloaded.
+    """
+    jobs = []
+    for name, config in functions.items():
+        if not config.get("dummy_filename"):
+            continue
+        jobs.append({
+            # Presigned URLs expire, so every attempt asks get_function for a fresh one
+            "url": lambda name=name: get_code_location(name),
+            "path": os.path.join(CODE_ROOT, config["dummy_filename"]),
+            "sha256": config.get("code_sha256"),
+        })
+    results = sync_packages(jobs, max_workers=max_workers)
+    failed = [path for path, ok in results.items() if not ok]
+    print(f"Downloaded {len(results) - len(failed)}/{len(results)} changed Lambda packages")
+    return results
+
+
+def add_source_code_hashes(functions):
+    """
+    Set source_code_hash on every function with a local package, so Terraform
+    does not re-hash each zip on every plan. Packages the sync verified against
+    Lambda's CodeSha256 reuse it while unchanged on disk; any other local file
+    is hashed here.
+    """
+    index = load_index()
+    for config in functions.values():
+        source_code_hash = None
+        if config.get("dummy_filename"):
+            path = os.path.join(CODE_ROOT, config["dummy_filename"])
+            source_code_hash = indexed_sha256(path, index)
+            if not source_code_hash and os.path.exists(path):
+                source_code_hash = code_sha256(path)
+        config["source_code_hash"] = source_code_hash
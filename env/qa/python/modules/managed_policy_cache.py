@@ -0,0 +1,62 @@
+# modules/managed_policy_cache.py
+#
+# Process-wide cache of IAM managed policies. The same AWS-managed and
+# customer-managed ARNs are attached to many roles, users and groups, so each
+# policy's metadata is fetched once per run and each document once per
+# (ARN, default version id). Policy versions are immutable, which also makes
+# them safe to serve from the on-disk response cache across runs.
+
+import threading
+
+from modules.aws_clients import lazy_client
+
+iam = lazy_client("iam")
+
+
+class ManagedPolicyCache:
+
+    def __init__(self):
+        self._policies = {}
+        self._documents = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _key_lock(self, key):
+        # One lock per key, so different policies are fetched concurrently
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_policy(self, policy_arn):
+        """get_policy metadata (including Tags and DefaultVersionId), fetched once per ARN."""
+        with self._key_lock(policy_arn):
+            if policy_arn not in self._policies:
+                self._policies[policy_arn] = iam.get_policy(PolicyArn=policy_arn)["Policy"]
+            return self._policies[policy_arn]
+
+    def get_document(self, policy_arn, version_id):
+        key = (policy_arn, version_id)
+        with self._key_lock(key):
+            if key not in self._documents:
+                version = iam.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)["PolicyVersion"]
+                self._documents[key] = version["Document"]
+            return self._documents[key]
+
+    def seed_document(self, policy_arn, version_id, document):
+        """Record a document already returned by a bulk listing."""
+        with self._key_lock((policy_arn, version_id)):
+            self._documents.setdefault((policy_arn, version_id), document)
+
+    def get(self, policy_arn):
+        """Metadata and default-version document for a managed policy."""
+        policy = self.get_policy(policy_arn)
+        return {
+            "policy": policy,
+            "document": self.get_document(policy_arn, policy["DefaultVersionId"]),
+        }
+
+
+_cache = ManagedPolicyCache()
+
+
+def get_managed_policy_cache():
+    return _cache
@@ -0,0 +1,40 @@
+# modules/policy_documents.py
+#
+# Interning for IAM policy JSON. Roles and inline policies repeat the same
+# normalised documents verbatim, so iam_roles.auto.tfvars.json carries each
+# unique document once in a policy_documents map and entries reference it by
+# hash (assume_role_policy_hash / policy_hash). modules/iam resolves the
+# references and still accepts the older inline JSON fields.
+
+import hashlib
+
+# Hex digits of the SHA-256 kept as the document key
+HASH_LENGTH = 16
+
+
+def policy_hash(policy_json):
+    return hashlib.sha256(policy_json.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+
+def intern_policy_json(policy_json, documents):
+    """Store policy_json in documents (hash -> JSON) and return its hash."""
+    key = policy_hash(policy_json)
+    documents.setdefault(key, policy_json)
+    return key
+
+
+def intern_role(role_config, inline_policies, documents):
+    """
+    Replace the policy JSON in a role and its inline policies with hash
+    references, adding the documents to documents. Returns the rewritten
+    (role_config, inline_policies).
+    """
+    role_config = dict(role_config)
+    role_config["assume_role_policy_hash"] = intern_policy_json(role_config.pop("assume_role_policy"), documents)
+
+    interned = {}
+    for key, policy in inline_policies.items():
+        policy = dict(policy)
+        policy["policy_hash"] = intern_policy_json(policy.pop("policy_json"), documents)
+        interned[key] = policy
+    return role_config, interned
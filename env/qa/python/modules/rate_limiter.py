@@ -0,0 +1,151 @@
+# modules/rate_limiter.py
+#
+# Shared client-side rate limiting for every boto3 client, keyed by botocore
+# service name. Each service gets a token bucket whose rate adapts AIMD-style:
+# successful calls add a little rate, throttled calls halve it. Throttled
+# calls are retried with jittered backoff instead of surfacing as errors.
+
+import random
+import threading
+import time
+
+# Starting rates (calls per second) for services with low API limits
+INITIAL_RATES = {
+    "apigateway": 2.0,
+    "cloudformation": 5.0,
+    "cognito-idp": 5.0,
+    "cognito-identity": 5.0,
+    "config": 5.0,
+    "iam": 5.0,
+    "sts": 5.0,
+}
+DEFAULT_INITIAL_RATE = 10.0
+
+# Ceilings the additive increase can climb to
+MAX_RATES = {
+    "apigateway": 10.0,
+    "cognito-idp": 15.0,
+    "cognito-identity": 15.0,
+    "iam": 20.0,
+}
+DEFAULT_MAX_RATE = 100.0
+
+MIN_RATE = 0.5
+RATE_INCREASE = 0.5        # calls/second added per successful call
+RATE_DECREASE = 0.5        # multiplier applied on throttle
+DECREASE_COOLDOWN = 1.0    # seconds; one burst of throttles only halves once
+
+MAX_THROTTLE_ATTEMPTS = 12
+MAX_BACKOFF_SECONDS = 20.0
+
+THROTTLE_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "BandwidthLimitExceeded",
+    "SlowDown",
+    "EC2ThrottledException",
+    "PriorRequestNotComplete",
+}
+
+
+class AdaptiveTokenBucket:
+    """Token bucket whose refill rate follows additive-increase/multiplicative-decrease."""
+
+    def __init__(self, rate, max_rate, min_rate=MIN_RATE):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        capacity = max(1.0, self.rate)
+        self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE)
+
+    def on_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < DECREASE_COOLDOWN:
+                return
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * RATE_DECREASE)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_decrease = now
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_limiter(service_name):
+    """Process-wide token bucket for a botocore service name."""
+    with _buckets_lock:
+        bucket = _buckets.get(service_name)
+        if bucket is None:
+            bucket = AdaptiveTokenBucket(
+                INITIAL_RATES.get(service_name, DEFAULT_INITIAL_RATE),
+                MAX_RATES.get(service_name, DEFAULT_MAX_RATE),
+            )
+            _buckets[service_name] = bucket
+        return bucket
+
+
+def is_throttle(http_response, parsed):
+    if http_response is not None and http_response.status_code == 429:
+        return True
+    return parsed.get("Error", {}).get("Code") in THROTTLE_ERROR_CODES
+
+
+def throttled(client):
+    """
+    Route every request a client sends (including botocore's own retries)
+    through the shared limiter for its service. Returns the client.
+    """
+    bucket = get_limiter(client.meta.service_model.service_name)
+
+    def acquire_token(**kwargs):
+        bucket.acquire()
+
+    def adapt_and_retry(response=None, attempts=None, **kwargs):
+        if response is None:
+            # Connection errors are left to botocore's retry handler
+            return None
+        http_response, parsed = response
+        if not is_throttle(http_response, parsed):
+            if http_response.status_code < 300:
+                bucket.on_success()
+            return None
+
+        bucket.on_throttle()
+        if attempts >= MAX_THROTTLE_ATTEMPTS:
+            return None
+        # Full-jitter exponential backoff; botocore sleeps for the returned delay
+        return random.uniform(0, min(MAX_BACKOFF_SECONDS, 0.5 * (2 ** attempts)))
+
+    client.meta.events.register("before-send", acquire_token)
+    client.meta.events.register("needs-retry", adapt_and_retry)
+    return client
@@ -0,0 +1,304 @@
+# modules/resource_registry.py
+#
+# Maps CloudFormation resource types to the fetcher that describes them and
+# the output bucket (the all_* dictionaries in main.py) the result lands in.
+
+import importlib
+import threading
+
+from modules.policy_documents import intern_role
+
+
+OUTPUT_BUCKETS = [
+    "all_buckets",
+    "all_dynamodb",
+    "all_lambdas",
+    "all_roles",
+    "all_inline_policies",
+    "all_policy_documents",
+    "all_users",
+    "all_groups",
+    "all_managed_policies",
+    "all_secrets",
+    "all_sns_topics",
+    "all_vpcs",
+    "apigw_rest_apis",
+    "apigw_account",
+    "apigw_domain_names",
+    "apigw_stages",
+    "apigw_resources",
+    "apigw_methods",
+    "apigw_method_responses",
+    "apigw_integrations",
+    "apigw_integration_responses",
+    "apigw_deployments",
+    "apigw_base_path_mappings",
+    "all_cloudfront_dists",
+    "all_cloudtrails",
+    "all_log_groups",
+    "all_user_pools",
+    "all_user_pool_clients",
+    "all_identity_pools",
+    "all_config_recorders",
+    "all_delivery_channels",
+    "all_config_rules",
+    "all_kms_keys",
+    "all_lambda_layers",
+    "all_waf_web_acls",
+    "all_waf_ip_sets",
+    "all_event_rules",
+    "all_sqs_queues",
+    "all_state_machines",
+]
+
+
+_import_lock = threading.Lock()
+
+
+def _import_ref(ref):
+    with _import_lock:
+        module_name, func_name = ref.split(":")
+        return getattr(importlib.import_module(module_name), func_name)
+
+
+def new_outputs():
+    """Empty output buckets, one dict per all_* collection."""
+    return {bucket: {} for bucket in OUTPUT_BUCKETS}
+
+
+class ResourceHandler:
+    """
+    How one CloudFormation resource type is described and merged.
+
+    service: botocore service name; fetches for the same service share a pool
+    fetch:   "package.module:function" called as function(rid, *reads); the
+             module is only imported when the first resource of this type shows up
+    bucket:  output bucket the default store writes config into, keyed by rid
+    store:   optional callable(outputs, rid, config) for non-trivial merges
+    phase:   handlers in a later phase run after earlier phases are merged
+    reads:   output buckets from earlier phases passed to fetch after rid
+    prefetch: optional "package.module:function" called once per phase with
+             every rid of this type, so bulk APIs can warm a catalogue first
+    """
+
+    def __init__(self, service, fetch, bucket=None, store=None, phase=0, reads=(), prefetch=None):
+        self.service = service
+        self.fetch_ref = fetch
+        self.bucket = bucket
+        self._store = store
+        self.phase = phase
+        self.reads = tuple(reads)
+        self.prefetch_ref = prefetch
+        self._fetch = None
+        self._prefetch = None
+
+    def resolve(self):
+        """Import the fetcher's module on first use."""
+        if self._fetch is None:
+            self._fetch = _import_ref(self.fetch_ref)
+        return self._fetch
+
+    def prefetch(self, rids):
+        if not self.prefetch_ref:
+            return
+        if self._prefetch is None:
+            self._prefetch = _import_ref(self.prefetch_ref)
+        self._prefetch(rids)
+
+    def fetch(self, rid, outputs):
+        return self.resolve()(rid, *(outputs[bucket] for bucket in self.reads))
+
+    def store(self, outputs, rid, config):
+        if self._store:
+            self._store(outputs, rid, config)
+        elif config:
+            outputs[self.bucket][rid] = config
+
+
+# -----------------------
+# IAM
+# -----------------------
+def _role_key(rid):
+    return rid.replace("-", "_").replace(".", "_")
+
+
+def _store_iam_role(outputs, rid, result):
+    role_config, inline_policies = result or (None, {})
+    if role_config:
+        # Policy JSON is emitted once per unique document and referenced by hash
+        role_config, inline_policies = intern_role(role_config, inline_policies, outputs["all_policy_documents"])
+        outputs["all_roles"][_role_key(rid)] = role_config
+        # Merge inline policies into the global map
+        outputs["all_inline_policies"].update(inline_policies)
+
+
+# -----------------------
+# API Gateway
+# -----------------------
+def _store_apigw_resource(outputs, rid, resource):
+    if not resource:
+        return
+    outputs["apigw_resources"][rid] = resource
+    rest_api_id = resource.get("rest_api_id")
+
+    # expand methods from resource into a flat map
+    methods = resource.get("resource_methods", {}) or {}
+    for method_name, method_cfg in methods.items():
+        http_method = method_cfg.get("httpMethod", method_name)
+        key = f"{rid}|{method_name}"
+        outputs["apigw_methods"][key] = {
+            "rest_api_id": rest_api_id,
+            "resource_id": rid,
+            "http_method": http_method,
+            "authorization": method_cfg.get("authorizationType", "NONE"),
+            "api_key_required": method_cfg.get("apiKeyRequired", False),
+            # Optional shapes; keep loose
+            "request_parameters": method_cfg.get("requestParameters"),
+            "request_models": method_cfg.get("requestModels"),
+        }
+
+        # Extract method responses
+        method_responses = method_cfg.get("methodResponses", {}) or {}
+        for status_code, resp_cfg in method_responses.items():
+            resp_key = f"{rid}|{method_name}|{status_code}"
+            outputs["apigw_method_responses"][resp_key] = {
+                "rest_api_id": rest_api_id,
+                "resource_id": rid,
+                "http_method": http_method,
+                "status_code": status_code,
+                "response_models": resp_cfg.get("responseModels"),
+                "response_parameters": resp_cfg.get("responseParameters"),
+            }
+
+        # Extract integration
+        integration = method_cfg.get("methodIntegration")
+        if not integration:
+            continue
+        outputs["apigw_integrations"][key] = {
+            "rest_api_id": rest_api_id,
+            "resource_id": rid,
+            "http_method": http_method,
+            "type": integration.get("type"),
+            "integration_http_method": integration.get("httpMethod"),
+            "uri": integration.get("uri"),
+            "credentials": integration.get("credentials"),
+            "request_parameters": integration.get("requestParameters"),
+            "request_templates": integration.get("requestTemplates"),
+            "passthrough_behavior": integration.get("passthroughBehavior"),
+            "timeout_milliseconds": integration.get("timeoutInMillis"),
+            "cache_namespace": integration.get("cacheNamespace"),
+            "cache_key_parameters": integration.get("cacheKeyParameters"),
+        }
+
+        # Extract integration responses
+        int_responses = integration.get("integrationResponses", {}) or {}
+        for int_status_code, int_resp_cfg in int_responses.items():
+            int_resp_key = f"{rid}|{method_name}|{int_status_code}"
+            outputs["apigw_integration_responses"][int_resp_key] = {
+                "rest_api_id": rest_api_id,
+                "resource_id": rid,
+                "http_method": http_method,
+                "status_code": int_status_code,
+                "response_parameters": int_resp_cfg.get("responseParameters"),
+                "response_templates": int_resp_cfg.get("responseTemplates"),
+                "selection_pattern": int_resp_cfg.get("selectionPattern"),
+            }
+
+
+# -----------------------
+# Registry
+# -----------------------
+RESOURCE_HANDLERS = {
+    "AWS::S3::Bucket": ResourceHandler("s3", "modules.s3_module:get_s3_config", "all_buckets"),
+    "AWS::DynamoDB::Table": ResourceHandler("dynamodb", "modules.dynamodb_module:get_dynamodb_config", "all_dynamodb"),
+    "AWS::Lambda::Function": ResourceHandler(
+        "lambda", "modules.lambda_module:get_lambda_config", "all_lambdas",
+        prefetch="modules.lambda_module:prefetch_functions",
+    ),
+    "AWS::IAM::Role": ResourceHandler(
+        "iam", "modules.iam_role_module:get_iam_role_config", store=_store_iam_role,
+        prefetch="modules.iam_role_module:prefetch_roles",
+    ),
+    # "AWS::IAM::User": ResourceHandler(
+    #     "iam", "modules.iam_role_module:get_iam_user_config", "all_users",
+    #     prefetch="modules.iam_role_module:prefetch_users",
+    # ),
+    # "AWS::IAM::Group": ResourceHandler(
+    #     "iam", "modules.iam_role_module:get_iam_group_config", "all_groups",
+    #     prefetch="modules.iam_role_module:prefetch_groups",
+    # ),
+    # "AWS::IAM::Policy": ResourceHandler(
+    #     "iam", "modules.iam_role_module:get_iam_managed_policy_config", "all_managed_policies",
+    #     prefetch="modules.iam_role_module:prefetch_managed_policies",
+    # ),
+    "AWS::SecretsManager::Secret": ResourceHandler("secretsmanager", "modules.secrets_manager_module:get_secret_config", "all_secrets"),
+    "AWS::SNS::Topic": ResourceHandler(
+        "sns", "modules.sns_module:get_sns_topic_config", "all_sns_topics",
+        prefetch="modules.sns_module:prefetch_topics",
+    ),
+    "AWS::EC2::VPC": ResourceHandler(
+        "ec2", "modules.vpc_module:get_vpc_config", "all_vpcs", prefetch="modules.vpc_module:prefetch_vpcs"
+    ),
+    "AWS::CloudFront::Distribution": ResourceHandler("cloudfront", "modules.cloudfront_module:get_cloudfront_config", "all_cloudfront_dists"),
+    "AWS::CloudTrail::Trail": ResourceHandler("cloudtrail", "modules.cloudtrail_module:get_cloudtrail_config", "all_cloudtrails"),
+    "AWS::Logs::LogGroup": ResourceHandler(
+        "logs", "modules.cloudwatch_module:get_log_group_config", "all_log_groups",
+        prefetch="modules.cloudwatch_module:prefetch_log_groups",
+    ),
+    "AWS::Cognito::UserPool": ResourceHandler("cognito-idp", "modules.cognito_module:get_user_pool_config", "all_user_pools"),
+    "AWS::Cognito::UserPoolClient": ResourceHandler(
+        "cognito-idp", "modules.cognito_module:get_user_pool_client_config_by_id", "all_user_pool_clients"
+    ),
+    "AWS::Cognito::IdentityPool": ResourceHandler(
+        "cognito-identity", "modules.cognito_module:get_identity_pool_config", "all_identity_pools"
+    ),
+    "AWS::Config::ConfigurationRecorder": ResourceHandler(
+        "config", "modules.config_module:get_config_recorder_with_status", "all_config_recorders"
+    ),
+    "AWS::Config::DeliveryChannel": ResourceHandler(
+        "config", "modules.config_module:get_delivery_channel_with_status", "all_delivery_channels"
+    ),
+    "AWS::Config::ConfigRule": ResourceHandler(
+        "config", "modules.config_module:get_config_rule_with_compliance", "all_config_rules"
+    ),
+    "AWS::KMS::Key": ResourceHandler("kms", "modules.kms_module:get_kms_key_config", "all_kms_keys"),
+    # Lambda layers are intentionally skipped for now
+    # "AWS::Lambda::LayerVersion": ResourceHandler(
+    #     "lambda", "modules.lambda_layer_module:get_lambda_layer_config_by_arn", "all_lambda_layers"
+    # ),
+    "AWS::WAFv2::WebACL": ResourceHandler("wafv2", "modules.waf_module:get_web_acl_config", "all_waf_web_acls"),
+    "AWS::WAFv2::IPSet": ResourceHandler("wafv2", "modules.waf_module:get_ip_set_config", "all_waf_ip_sets"),
+    "AWS::Events::Rule": ResourceHandler("events", "modules.events_module:get_event_rule_config", "all_event_rules"),
+    "AWS::SQS::Queue": ResourceHandler(
+        "sqs", "modules.sqs_module:get_sqs_queue_config_by_physical_resource_id", "all_sqs_queues",
+        prefetch="modules.sqs_module:prefetch_queues",
+    ),
+    "AWS::StepFunctions::StateMachine": ResourceHandler(
+        "stepfunctions", "modules.stepfunctions_module:get_state_machine_config_by_arn", "all_state_machines"
+    ),
+    "AWS::ApiGateway::RestApi": ResourceHandler(
+        "apigateway", "modules.apigateway_module:get_rest_api_config_for_rid", "apigw_rest_apis"
+    ),
+    "AWS::ApiGateway::Account": ResourceHandler(
+        "apigateway", "modules.apigateway_module:get_account_config_for_rid", "apigw_account"
+    ),
+    # CFN rid for domain is the domain name itself
+    "AWS::ApiGateway::DomainName": ResourceHandler(
+        "apigateway", "modules.apigateway_module:get_domain_name_config", "apigw_domain_names"
+    ),
+    "AWS::ApiGateway::Stage": ResourceHandler(
+        "apigateway", "modules.apigateway_module:get_stage_config_for_rid", "apigw_stages"
+    ),
+    "AWS::ApiGateway::Resource": ResourceHandler(
+        "apigateway", "modules.apigateway_module:get_resource_config_by_id", store=_store_apigw_resource
+    ),
+    # These read domain names / stages collected in phase 0
+    "AWS::ApiGateway::BasePathMapping": ResourceHandler(
+        "apigateway", "modules.apigateway_module:get_base_path_mapping_for_rid", "apigw_base_path_mappings",
+        phase=1, reads=["apigw_domain_names"],
+    ),
+    "AWS::ApiGateway::Deployment": ResourceHandler(
+        "apigateway", "modules.apigateway_module:get_deployment_config_for_rid", "apigw_deployments",
+        phase=1, reads=["apigw_stages"],
+    ),
+}
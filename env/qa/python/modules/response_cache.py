@@ -0,0 +1,184 @@
+# modules/response_cache.py
+#
+# Opt-in on-disk cache of parsed botocore responses, attached to clients by
+# modules/aws_clients.py. Entries are keyed by (service, operation, params,
+# account, region), stored as zlib-compressed pickles with a per-service TTL,
+# and evicted oldest-first once the cache directory exceeds its size budget.
+# With offline=True every stored entry is served regardless of age, and a
+# cache miss fails fast instead of calling AWS.
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import zlib
+
+from botocore.awsrequest import AWSResponse
+
+DEFAULT_CACHE_DIR = ".aws_response_cache"
+DEFAULT_TTL = 12 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Seconds a cached response stays valid, per botocore service name
+SERVICE_TTLS = {
+    "cloudformation": 3600,
+    "sts": 7 * 24 * 3600,
+}
+
+CACHE_MISS_CODE = "OfflineCacheMiss"
+
+
+class _EmptyBody:
+    def stream(self, **kwargs):
+        return iter(())
+
+
+class ResponseCache:
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, default_ttl=DEFAULT_TTL,
+                 service_ttls=None, max_bytes=DEFAULT_MAX_BYTES, offline=False):
+        self.directory = directory
+        self.default_ttl = default_ttl
+        self.service_ttls = dict(SERVICE_TTLS)
+        self.service_ttls.update(service_ttls or {})
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    # -----------------------
+    # Storage
+    # -----------------------
+    def make_key(self, service, operation, params, account, region):
+        raw = json.dumps([service, operation, params, account, region], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, service, key):
+        return os.path.join(self.directory, service, key[:2], f"{key}.bin")
+
+    def get(self, service, key):
+        path = self._path(service, key)
+        try:
+            with open(path, "rb") as f:
+                stored_at, parsed = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        # Offline runs have nothing fresher to fall back on, so entries never expire
+        if not self.offline and time.time() - stored_at > self.service_ttls.get(service, self.default_ttl):
+            return None
+        # Bump mtime so eviction drops the least recently used entries first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return parsed
+
+    def put(self, service, key, parsed):
+        path = self._path(service, key)
+        data = zlib.compress(pickle.dumps((time.time(), parsed), protocol=pickle.HIGHEST_PROTOCOL))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size += len(data) - old_size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def evict(self):
+        """Delete least recently used entries until the cache is at 90% of its budget."""
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            size = sum(entry_size for _, entry_size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            for path, entry_size, _ in entries:
+                if size <= target:
+                    break
+                try:
+                    os.remove(path)
+                    size -= entry_size
+                except OSError:
+                    continue
+            self._size = size
+
+    def _count_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    # -----------------------
+    # botocore hooks
+    # -----------------------
+    def attach(self, client, account):
+        """Serve client calls from the cache and record successful responses."""
+        service = client.meta.service_model.service_name
+        region = client.meta.region_name
+
+        def remember_params(params, model, context, **kwargs):
+            # api params before serialisation; copied into the key right away
+            context["response_cache_key"] = self.make_key(service, model.name, params, account, region)
+
+        def serve_from_cache(model, context, **kwargs):
+            key = context.get("response_cache_key")
+            if key is None:
+                return None
+            parsed = self.get(service, key)
+            if parsed is not None:
+                self._count_hit()
+                context["response_cache_hit"] = True
+                return AWSResponse(f"cache://{service}", 200, {}, _EmptyBody()), parsed
+
+            self._count_miss()
+            if self.offline:
+                context["response_cache_hit"] = True
+                error = {
+                    "Error": {
+                        "Code": CACHE_MISS_CODE,
+                        "Message": f"{service}.{model.name} is not in the response cache (offline run)",
+                    },
+                    "ResponseMetadata": {"HTTPStatusCode": 404},
+                }
+                return AWSResponse(f"cache://{service}", 404, {}, _EmptyBody()), error
+            return None
+
+        def store_response(http_response, parsed, context, **kwargs):
+            key = context.get("response_cache_key")
+            if key is None or context.get("response_cache_hit"):
+                return
+            if http_response.status_code < 300:
+                self.put(service, key, parsed)
+
+        client.meta.events.register("before-parameter-build", remember_params)
+        client.meta.events.register("before-call", serve_from_cache)
+        client.meta.events.register("after-call", store_response)
+        return client
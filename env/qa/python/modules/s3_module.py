@@ -1,27 +1,57 @@
-import boto3
+import threading
+
 from botocore.exceptions import ClientError
+from modules.aws_clients import get_client, lazy_client
+
+s3 = lazy_client("s3")
+
+# -----------------------
+# Bucket catalogue: one ListBuckets pass per run, indexed by name
+# -----------------------
+_bucket_catalogue = None
+_bucket_catalogue_lock = threading.Lock()
+
+
+def get_bucket_catalogue():
+    global _bucket_catalogue
+    with _bucket_catalogue_lock:
+        if _bucket_catalogue is None:
+            catalogue = {}
+            paginator = s3.get_paginator("list_buckets")
+            for page in paginator.paginate():
+                for b in page.get("Buckets", []):
+                    catalogue[b["Name"]] = b
+            _bucket_catalogue = catalogue
+        return _bucket_catalogue
+
+
+def get_bucket_region(bucket_name, entry=None):
+    # ListBuckets reports BucketRegion on current APIs; older responses need a lookup
+    region = (entry or {}).get("BucketRegion")
+    if not region:
+        region = s3.get_bucket_location(Bucket=bucket_name)["LocationConstraint"]
+    if region is None:  # us-east-1 special case
+        region = "us-east-1"
+    elif region == "EU":  # legacy location constraint for eu-west-1
+        region = "eu-west-1"
+    return region
 
-s3 = boto3.client("s3")
 
 # -----------------------
 # Function: Get S3 bucket config
 # -----------------------
 def get_s3_config(bucket_name):
     try:
+        entry = get_bucket_catalogue().get(bucket_name, {})
+
         # Region
-        region = s3.get_bucket_location(Bucket=bucket_name)["LocationConstraint"]
-        if region is None:  # us-east-1 special case
-            region = "us-east-1"
+        region = get_bucket_region(bucket_name, entry)
 
         # Creation date
-        creation_date = None
-        for b in s3.list_buckets()["Buckets"]:
-            if b["Name"] == bucket_name:
-                creation_date = b["CreationDate"].isoformat()
-                break
-
-        # Versioning
-        versioning = s3.get_bucket_versioning(Bucket=bucket_name)
+        creation_date = entry["CreationDate"].isoformat() if entry.get("CreationDate") else None
+
+        # Versioning, asked of the bucket's own region to avoid a redirect
+        versioning = get_client("s3", region).get_bucket_versioning(Bucket=bucket_name)
         versioning_status = versioning.get("Status", "Disabled")
 
         return {
@@ -33,5 +63,3 @@ def get_s3_config(bucket_name):
     except Exception as e:
         print(f"⚠️ Error fetching bucket {bucket_name}: {e}")
         return None
-
-
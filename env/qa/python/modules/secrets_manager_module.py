@@ -1,7 +1,7 @@
-import boto3
 from botocore.exceptions import ClientError
+from modules.aws_clients import lazy_client
 
-secretsmanager = boto3.client("secretsmanager")
+secretsmanager = lazy_client("secretsmanager")
 
 # -----------------------
 # Function: Get Secret config
@@ -1,16 +1,64 @@
 # modules/sns_module.py
-import boto3
+import threading
 
-sns = boto3.client("sns")
+from modules.aws_clients import lazy_client
+from modules.concurrency import parallel_map
 
-def get_sns_topic_config(topic_arn):
-    try:
+sns = lazy_client("sns")
+
+# Concurrent attribute/tag lookups while prefetching
+TOPIC_WORKERS = 8
+
+# -----------------------
+# Subscription index: one account-wide list_subscriptions pass, grouped by topic
+# -----------------------
+_subscriptions = None
+_subscriptions_lock = threading.Lock()
+_topic_details = {}
+
+
+def get_subscription_index():
+    global _subscriptions
+    with _subscriptions_lock:
+        if _subscriptions is None:
+            index = {}
+            paginator = sns.get_paginator("list_subscriptions")
+            for page in paginator.paginate():
+                for sub in page.get("Subscriptions", []):
+                    index.setdefault(sub["TopicArn"], []).append(sub)
+            _subscriptions = index
+        return _subscriptions
+
+
+def get_topic_details(topic_arn):
+    """(attributes, tags) for a topic, fetched once per run."""
+    if topic_arn not in _topic_details:
         attrs = sns.get_topic_attributes(TopicArn=topic_arn)["Attributes"]
         tags = sns.list_tags_for_resource(ResourceArn=topic_arn).get("Tags", [])
-        subs_response = sns.list_subscriptions_by_topic(TopicArn=topic_arn)
+        _topic_details[topic_arn] = (attrs, tags)
+    return _topic_details[topic_arn]
+
+
+def _get_topic_details_safe(topic_arn):
+    try:
+        get_topic_details(topic_arn)
+    except Exception as e:
+        print(f"⚠️ Failed to get SNS topic {topic_arn}: {e}")
+
+
+def prefetch_topics(topic_arns):
+    """Load the subscription index, then attributes and tags for the requested topics concurrently."""
+    get_subscription_index()
+    arns = [arn for arn in topic_arns if arn not in _topic_details]
+    parallel_map(_get_topic_details_safe, arns, max_workers=TOPIC_WORKERS)
+
+
+def get_sns_topic_config(topic_arn):
+    try:
+        attrs, tags = get_topic_details(topic_arn)
         subscriptions = []
 
-        for sub in subs_response.get("Subscriptions", []):
+        for sub in get_subscription_index().get(topic_arn, []):
             if sub["SubscriptionArn"] != "PendingConfirmation":
                 subscriptions.append({
                     "protocol": sub["Protocol"],
@@ -32,4 +80,3 @@ def get_sns_topic_config(topic_arn):
     except Exception as e:
         print(f"⚠️ Failed to get SNS topic {topic_arn}: {e}")
         return None
-
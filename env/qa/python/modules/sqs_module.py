@@ -1,43 +1,65 @@
-import boto3
 from botocore.exceptions import ClientError
 import json
+from modules.aws_clients import lazy_client
+from modules.concurrency import parallel_map
+
+sqs = lazy_client("sqs")
+
+# Concurrent attribute/tag lookups while prefetching
+QUEUE_WORKERS = 8
+
+# queue url -> (attributes, tags), filled by prefetch_queues
+_queue_details = {}
+
+
+def get_queue_details(queue_url):
+    """All attributes (Policy included) and tags for a queue, fetched once per run."""
+    if queue_url not in _queue_details:
+        queue_name = queue_url.split('/')[-1]
+        attributes = sqs.get_queue_attributes(
+            QueueUrl=queue_url,
+            AttributeNames=['All']
+        ).get('Attributes', {})
+
+        try:
+            tags = sqs.list_queue_tags(QueueUrl=queue_url).get('Tags', {})
+        except ClientError as e:
+            print(f"⚠️ Warning: Could not retrieve tags for queue {queue_name}: {e}")
+            tags = {}
+        _queue_details[queue_url] = (attributes, tags)
+    return _queue_details[queue_url]
+
+
+def _get_queue_details_safe(queue_url):
+    try:
+        get_queue_details(queue_url)
+    except Exception as e:
+        print(f"⚠️ Error fetching SQS queue {queue_url}: {e}")
+
+
+def prefetch_queues(physical_resource_ids):
+    """Fetch attributes and tags for every queue given by URL, concurrently."""
+    urls = [rid for rid in physical_resource_ids if _is_queue_url(rid) and rid not in _queue_details]
+    parallel_map(_get_queue_details_safe, urls, max_workers=QUEUE_WORKERS)
+
+
+def _is_queue_url(physical_resource_id):
+    return physical_resource_id.startswith(("https://", "http://"))
 
-sqs = boto3.client("sqs")
 
 # -----------------------
 # Function: Get SQS queue config
 # -----------------------
 def get_sqs_queue_config(queue_url):
     try:
-        # Get queue attributes
-        attributes_response = sqs.get_queue_attributes(
-            QueueUrl=queue_url,
-            AttributeNames=['All']
-        )
-        attributes = attributes_response.get('Attributes', {})
-        
+        attributes, tags = get_queue_details(queue_url)
+
         # Extract queue name from URL
         queue_name = queue_url.split('/')[-1]
-        
-        # Get queue policy if it exists
-        try:
-            policy_response = sqs.get_queue_attributes(
-                QueueUrl=queue_url,
-                AttributeNames=['Policy']
-            )
-            policy = policy_response.get('Attributes', {}).get('Policy')
-        except ClientError as e:
-            print(f"⚠️ Warning: Could not retrieve policy for queue {queue_name}: {e}")
-            policy = None
-        
-        # Get tags
-        try:
-            tags_response = sqs.list_queue_tags(QueueUrl=queue_url)
-            tags = tags_response.get('Tags', {})
-        except ClientError as e:
-            print(f"⚠️ Warning: Could not retrieve tags for queue {queue_name}: {e}")
-            tags = {}
-        
+
+        # 'All' already includes the queue policy
+        policy = attributes.get('Policy')
+
         # Parse redrive policy if it exists
         redrive_policy = None
         if attributes.get('RedrivePolicy'):
@@ -83,12 +105,14 @@ def get_sqs_queue_config(queue_url):
 # -----------------------
 def get_sqs_queue_config_by_physical_resource_id(physical_resource_id):
     """
-    Extract the queue name from the full URL and fetch the SQS queue config.
+    CloudFormation's physical id for a queue is its URL, so use it directly;
+    fall back to resolving a bare queue name.
     """
-    # Extract queue name from URL (last part after "/")
+    if _is_queue_url(physical_resource_id):
+        return get_sqs_queue_config(physical_resource_id)
+
+    # Extract queue name (last part after "/")
     queue_name = physical_resource_id.split('/')[-1]
-    
-    # Fetch the queue configuration using the queue name
     return get_sqs_queue_config_by_name(queue_name)
 
 
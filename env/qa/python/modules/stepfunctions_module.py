@@ -1,8 +1,8 @@
-import boto3
 from botocore.exceptions import ClientError, ParamValidationError
+from modules.aws_clients import lazy_client
 
 # Initialize the Step Functions client
-stepfunctions = boto3.client("stepfunctions")
+stepfunctions = lazy_client("stepfunctions")
 
 
 # -----------------------
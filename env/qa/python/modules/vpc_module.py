@@ -1,33 +1,124 @@
-import boto3
+import threading
 
-ec2 = boto3.client("ec2")
+from modules.aws_clients import lazy_client
+from modules.concurrency import parallel_map
+
+ec2 = lazy_client("ec2")
 
 def format_tags(tag_list):
     """Convert AWS tag list to Terraform-style list of maps."""
     return [{"Key": tag["Key"], "Value": tag["Value"]} for tag in tag_list]
 
+# EC2 accepts at most 200 values per filter
+FILTER_CHUNK = 200
+
+# (describe operation, result key, filter name) for every per-VPC resource kind
+VPC_RESOURCE_KINDS = {
+    "subnets": ("describe_subnets", "Subnets", "vpc-id"),
+    "internet_gateways": ("describe_internet_gateways", "InternetGateways", "attachment.vpc-id"),
+    "route_tables": ("describe_route_tables", "RouteTables", "vpc-id"),
+    "security_groups": ("describe_security_groups", "SecurityGroups", "vpc-id"),
+    "network_acls": ("describe_network_acls", "NetworkAcls", "vpc-id"),
+    "nat_gateways": ("describe_nat_gateways", "NatGateways", "vpc-id"),
+}
+
+# vpc id -> raw describe results, filled by prefetch_vpcs
+_vpc_details = {}
+_vpc_details_lock = threading.Lock()
+
+
+def _chunks(values, size=FILTER_CHUNK):
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def _describe_all(operation, result_key, filter_name, values):
+    items = []
+    paginator = ec2.get_paginator(operation)
+    for chunk in _chunks(values):
+        for page in paginator.paginate(Filters=[{"Name": filter_name, "Values": chunk}]):
+            items.extend(page.get(result_key, []))
+    return items
+
+
+def _item_vpc_id(kind, item):
+    if kind == "internet_gateways":
+        attachments = item.get("Attachments", [])
+        return attachments[0].get("VpcId") if attachments else None
+    return item.get("VpcId")
+
+
+def _describe_eips_by_vpc(vpc_ids):
+    """VPC-domain EIPs, attributed to a VPC through the network interface they are associated with."""
+    eips = ec2.describe_addresses(Filters=[{"Name": "domain", "Values": ["vpc"]}])["Addresses"]
+    eni_ids = sorted({eip["NetworkInterfaceId"] for eip in eips if eip.get("NetworkInterfaceId")})
+    eni_vpcs = {}
+    if eni_ids:
+        for eni in _describe_all("describe_network_interfaces", "NetworkInterfaces", "network-interface-id", eni_ids):
+            eni_vpcs[eni["NetworkInterfaceId"]] = eni.get("VpcId")
+
+    by_vpc = {vpc_id: [] for vpc_id in vpc_ids}
+    for eip in eips:
+        vpc_id = eni_vpcs.get(eip.get("NetworkInterfaceId"))
+        if vpc_id in by_vpc:
+            by_vpc[vpc_id].append(eip)
+    return by_vpc
+
+
+def describe_vpcs_batch(vpc_ids):
+    """
+    Describe several VPCs and everything in them with one paginated call per
+    resource kind (filtered on the whole id list), split by VPC in memory.
+    Returns {vpc id: {"vpc": ..., "subnets": [...], ..., "eips": [...]}}.
+    """
+    vpc_ids = list(dict.fromkeys(vpc_ids))
+    vpcs = _describe_all("describe_vpcs", "Vpcs", "vpc-id", vpc_ids)
+    details = {vpc["VpcId"]: {"vpc": vpc, **{kind: [] for kind in VPC_RESOURCE_KINDS}} for vpc in vpcs}
+
+    kinds = list(VPC_RESOURCE_KINDS)
+    results = parallel_map(
+        lambda kind: _describe_all(*VPC_RESOURCE_KINDS[kind], list(details)),
+        kinds,
+        max_workers=len(kinds),
+    )
+    for kind, items in zip(kinds, results):
+        for item in items:
+            vpc_id = _item_vpc_id(kind, item)
+            if vpc_id in details:
+                details[vpc_id][kind].append(item)
+
+    for vpc_id, eips in _describe_eips_by_vpc(list(details)).items():
+        details[vpc_id]["eips"] = eips
+    return details
+
+
+def prefetch_vpcs(vpc_ids):
+    details = describe_vpcs_batch(vpc_ids)
+    with _vpc_details_lock:
+        _vpc_details.update(details)
+
+
 def get_vpc_config(vpc_id):
     try:
-        # Fetch VPC and associated resources
-        vpc_response = ec2.describe_vpcs(VpcIds=[vpc_id])["Vpcs"][0]
-        subnets = ec2.describe_subnets(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["Subnets"]
-        igws = ec2.describe_internet_gateways(Filters=[{"Name": "attachment.vpc-id", "Values": [vpc_id]}])["InternetGateways"]
-        route_tables = ec2.describe_route_tables(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["RouteTables"]
-        security_groups = ec2.describe_security_groups(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["SecurityGroups"]
-        nacls = ec2.describe_network_acls(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["NetworkAcls"]
+        with _vpc_details_lock:
+            details = _vpc_details.get(vpc_id)
+        if details is None:
+            details = describe_vpcs_batch([vpc_id]).get(vpc_id)
+        if details is None:
+            print(f"⚠️ VPC {vpc_id} not found")
+            return None
+
+        vpc_response = details["vpc"]
+        subnets = details["subnets"]
+        igws = details["internet_gateways"]
+        route_tables = details["route_tables"]
+        security_groups = details["security_groups"]
+        nacls = details["network_acls"]
 
         # Filter out the default Network ACLs (IsDefault is True)
         nacls = [nacl for nacl in nacls if not nacl["IsDefault"]]
 
-        # Fetch NAT Gateways (with additional debugging)
-        try:
-            nat_gateways = ec2.describe_nat_gateways(Filters=[{"Name": "vpc-id", "Values": [vpc_id]}])["NatGateways"]
-        except KeyError:
-            print(f"⚠️ No NAT Gateways found for VPC {vpc_id}.")
-            nat_gateways = []
-
-        # Fetch Elastic IPs
-        eips = ec2.describe_addresses(Filters=[{"Name": "domain", "Values": ["vpc"]}])["Addresses"]
+        nat_gateways = details["nat_gateways"]
+        eips = details["eips"]
 
         # Build the VPC object for Terraform
         vpc_block = {
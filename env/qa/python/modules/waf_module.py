@@ -1,6 +1,6 @@
-import boto3
+from modules.aws_clients import lazy_client
 
-wafv2 = boto3.client("wafv2")
+wafv2 = lazy_client("wafv2")
 
 # Helper to detect the scope from ARN
 def detect_scope_from_arn(arn: str) -> str:
@@ -74,6 +74,7 @@ variable "functions" {
     memory_size           = number
     timeout               = number
     dummy_filename        = optional(string)
+    source_code_hash      = optional(string)
     environment_variables = optional(map(string))
     layers                = optional(list(string), [])
     architectures         = optional(list(string), ["x86_64"])
@@ -97,7 +98,8 @@ variable "roles" {
   type = map(object({
     role_name                 = string
     path                      = optional(string, "/")
-    assume_role_policy        = string  # JSON string
+    assume_role_policy        = optional(string)  # JSON string (older tfvars)
+    assume_role_policy_hash   = optional(string)  # Key into var.policy_documents
     description               = optional(string)
     max_session_duration      = optional(number)
     permissions_boundary      = optional(string)
@@ -112,11 +114,18 @@ variable "inline_policies" {
   type = map(object({
     role_id     = string  # Must match a key from var.roles
     policy_name = string
-    policy_json = string  # JSON string
+    policy_json = optional(string)  # JSON string (older tfvars)
+    policy_hash = optional(string)  # Key into var.policy_documents
   }))
   default = {}
 }
 
+variable "policy_documents" {
+  description = "Unique IAM policy JSON documents keyed by hash (auto-generated)"
+  type        = map(string)
+  default     = {}
+}
+
 variable "secrets" {
   type = map(object({
     name                = string
@@ -4,7 +4,7 @@ resource "aws_iam_role" "managed" {
 
   name                 = each.value.role_name
   path                 = try(each.value.path, "/")
-  assume_role_policy   = each.value.assume_role_policy  # Already JSON string
+  assume_role_policy   = try(var.policy_documents[each.value.assume_role_policy_hash], each.value.assume_role_policy)
   description          = try(each.value.description, null)
   max_session_duration = try(each.value.max_session_duration, 3600)
   permissions_boundary = try(each.value.permissions_boundary, null)
@@ -53,7 +53,7 @@ resource "aws_iam_role_policy" "inline" {
 
   name   = each.value.policy_name
   role   = aws_iam_role.managed[each.value.role_id].id
-  policy = each.value.policy_json  # Already a JSON string
+  policy = try(var.policy_documents[each.value.policy_hash], each.value.policy_json)
 
   depends_on = [aws_iam_role.managed]
 }
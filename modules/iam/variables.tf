@@ -3,7 +3,8 @@ variable "roles" {
   type = map(object({
     role_name                 = string
     path                      = optional(string, "/")
-    assume_role_policy        = string  # JSON string
+    assume_role_policy        = optional(string)  # JSON string (older tfvars)
+    assume_role_policy_hash   = optional(string)  # Key into var.policy_documents
     description               = optional(string, "")
     max_session_duration      = optional(number, 3600)
     permissions_boundary      = optional(string, null)
@@ -18,11 +19,18 @@ variable "inline_policies" {
   type = map(object({
     role_id     = string  # Must match a key from var.roles
     policy_name = string
-    policy_json = string  # JSON string
+    policy_json = optional(string)  # JSON string (older tfvars)
+    policy_hash = optional(string)  # Key into var.policy_documents
   }))
   default = {}
 }
 
+variable "policy_documents" {
+  description = "Unique policy JSON documents keyed by hash, referenced by roles and inline policies"
+  type        = map(string)
+  default     = {}
+}
+
 variable "tags" {
   description = "Common tags to apply to IAM roles"
   type        = map(string)
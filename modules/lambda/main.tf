@@ -14,7 +14,8 @@ resource "aws_lambda_function" "managed" {
   publish = try(each.value.publish_version, false)
 
   filename         = each.value.dummy_filename
-  source_code_hash = filebase64sha256(each.value.dummy_filename)
+  # Precomputed by the exporter; hash the zip only for older tfvars without it
+  source_code_hash = try(coalesce(each.value.source_code_hash), filebase64sha256(each.value.dummy_filename))
 
   layers        = try(each.value.layers, [])
   architectures = try(each.value.architectures, ["x86_64"])
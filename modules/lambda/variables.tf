@@ -7,6 +7,7 @@ variable "functions" {
     memory_size           = number
     timeout               = number
     dummy_filename        = optional(string)
+    source_code_hash      = optional(string)
     description           = optional(string)
     tracing_mode          = optional(string)
     dead_letter_queue     = optional(string)